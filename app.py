@@ -1,12 +1,17 @@
 import streamlit as st
 import os
+import uuid
 import pandas as pd
 from dotenv import load_dotenv
 
 from src.parser import parse_document
-from src.nlp import extract_entities, highlight_entities
+from src.nlp import highlight_entities
+from src.clause_classifier import CLAUSE_TYPES
+from src.clause_index import get_clause_index
+from src.gateway import gateway_backend, get_gateway
 from src.llm import LLMService
-from src.risk import calculate_risk_score, get_risk_level
+from src.pipeline import AnalysisError, analyze_contract
+from src.translation import Translator
 from src.utils import generate_audit_log
 
 # Load environment variables
@@ -30,6 +35,12 @@ if "analysis_result" not in st.session_state:
     st.session_state["analysis_result"] = None
 if "contract_text" not in st.session_state:
     st.session_state["contract_text"] = None
+if "user_id" not in st.session_state:
+    st.session_state["user_id"] = uuid.uuid4().hex
+
+def get_llm():
+    """LLMService for this session, routed through the shared rate-limited gateway."""
+    return LLMService(backend=gateway_backend(st.session_state["user_id"]))
 
 # Sidebar
 st.sidebar.title("ContractAI ⚖️")
@@ -38,7 +49,7 @@ st.sidebar.info("GenAI-powered Contract Analysis & Risk Assessment")
 # API Key check
 groq_key = os.getenv("GROQ_API_KEY")
 
-if not groq_key:
+if not groq_key and os.getenv("LLM_BACKEND", "groq").lower() == "groq":
     st.sidebar.warning("⚠️ No Groq API Key found in .env! Using mock mode.")
 
 # Navigation
@@ -65,6 +76,16 @@ def render_dashboard():
     })
     st.dataframe(df, use_container_width=True)
 
+    gateway = get_gateway()
+    if gateway:
+        st.subheader("LLM Gateway")
+        metrics = gateway.metrics()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Queue Depth", metrics["queue_depth"])
+        col2.metric("Avg Wait", f"{metrics['avg_wait']:.2f}s")
+        col3.metric("P95 Wait", f"{metrics['p95_wait']:.2f}s")
+        col4.metric("Coalesced Requests", metrics["coalesced"])
+
 def render_analysis():
     st.title("Contract Analysis")
     
@@ -79,8 +100,18 @@ def render_analysis():
             with st.spinner("Parsing and Analyzing..."):
                 try:
                     # 1. Parse
-                    text = parse_document(uploaded_file)
+                    parse_stats = {}
+                    text = parse_document(uploaded_file, stats=parse_stats,
+                                          trace_memory=os.getenv("PARSE_TRACE_MEMORY") == "1")
                     st.session_state["contract_text"] = text
+                    parse_note = f"Parsed {parse_stats['bytes'] / 1024:.0f} KB"
+                    if "pages" in parse_stats:
+                        parse_note += f", {parse_stats['pages']} pages"
+                    parse_note += f" in {parse_stats['seconds']:.2f}s"
+                    if "peak_memory" in parse_stats:
+                        parse_note += f", peak memory {parse_stats['peak_memory'] / 1024 / 1024:.1f} MB"
+                    st.caption(parse_note)
+                    generate_audit_log("Parse", f"{uploaded_file.name}: {parse_note}")
                     
                     # Translation if needed (Mock/Simple)
                     if target_lang != "English":
@@ -89,43 +120,25 @@ def render_analysis():
                         # For now, let's keep the main text as is but note the language
                         pass
                     
-                    # 2. NLP Extraction
-                    entities = extract_entities(text)
-                    
-                    # 3. LLM Analysis
-                    llm = LLMService()
-                    summary_json = llm.summarize_contract(text)
-                    
-                    if "error" in summary_json:
-                        st.error(f"Analysis Failed: {summary_json['error']}")
-                        st.stop()
-                    
-                    # 4. Clause Analysis
-                    from src.nlp import split_into_clauses
-                    clauses = split_into_clauses(text)
-                    clause_analysis = llm.batch_analyze_clauses(clauses)
-                    
-                    # 5. Risk Calculation
-                    # Use real clause scores if available, else fallback
-                    if clause_analysis:
-                        risk_score = calculate_risk_score(clause_analysis, summary_json.get("overall_risk", "Medium"))
-                    else:
-                        clauses_mock = [
-                            {"risk_score": summary_json.get("risk_score", 5)},
-                            {"risk_score": 2},
-                            {"risk_score": 8 if summary_json.get("overall_risk") == "High" else 3}
-                        ]
-                        risk_score = calculate_risk_score(clauses_mock, summary_json.get("overall_risk", "Medium"))
-                    
-                    st.session_state["analysis_result"] = {
-                        "text": text,
-                        "entities": entities,
-                        "summary": summary_json,
-                        "clauses": clause_analysis,
-                        "composite_risk": risk_score,
-                        "risk_level": get_risk_level(risk_score)
-                    }
-                    
+                    # 2. Entities, summary, clause analysis and risk score
+                    progress = st.empty()
+                    result, report = analyze_contract(
+                        text, get_llm(), index=get_clause_index(), contract=uploaded_file.name,
+                        on_clause=lambda analysis, done: progress.caption(
+                            f"Analyzed clause {analysis.get('id', '?')} ({done} done)"))
+                    progress.empty()
+                    routing = report["routing"]
+                    st.caption(f"Classified {report['clauses']} clauses in {report['classify_seconds'] * 1000:.0f} ms; "
+                               f"{routing['skipped']} boilerplate clause(s) skipped.")
+                    st.caption(f"Clause analysis sent an estimated {report['prompt_tokens']} prompt tokens for "
+                               f"{routing['routed_clauses']} clause(s). Without skipping, {routing['generic_boilerplate']} "
+                               f"of the {routing['generic_clauses']} analyzed clauses would have been boilerplate.")
+                    if report["reused"]:
+                        st.caption(f"{report['reused']} clause(s) were identical to previously analyzed clauses and were reused.")
+                    st.session_state["analysis_result"] = result
+
+                except AnalysisError as e:
+                    st.error(f"Analysis Failed: {e}")
                 except Exception as e:
                     st.error(f"Error during analysis: {e}")
                     
@@ -196,7 +209,12 @@ def render_analysis():
                     if risk >= 8: color = "red"
                     elif risk >= 5: color = "orange"
                     
-                    with st.expander(f"Clause {clause.get('id', '?')} - Risk: :{color}[{risk}/10]"):
+                    title = f"Clause {clause.get('id', '?')}"
+                    clause_type = clause.get("clause_type")
+                    if clause_type:
+                        title += f" ({CLAUSE_TYPES.get(clause_type, {}).get('label', 'Other')})"
+                    title += f" - Risk: :{color}[{risk}/10]" if "risk_score" in clause else " - Not analyzed"
+                    with st.expander(title):
                         st.markdown(f"**Original Text**:\n> {clause.get('original_text', '')}")
                         st.markdown(f"**Explanation:** {clause.get('explanation', 'N/A')}")
                         if risk > 3:
@@ -206,11 +224,28 @@ def render_analysis():
             
         with tab4:
              st.subheader(f"Translation to {target_lang}")
-             if st.button(f"Translate Summary to {target_lang}"):
-                 llm = LLMService()
-                 summary_text = res["summary"].get("summary", "")
-                 translated = llm.translate_text(summary_text, target_lang)
-                 st.write(translated)
+             if st.button(f"Translate Analysis to {target_lang}"):
+                 translator = Translator(get_llm())
+                 with st.spinner("Translating..."):
+                     translated = translator.translate_analysis(res, target_lang)
+                 stats = translator.stats
+                 st.caption(f"{stats['segments']} sentences: {stats['memory_hits']} from translation memory, "
+                            f"{stats['translated']} translated in {stats['api_calls']} API calls")
+                 if stats["untranslated"]:
+                     warning = (f"{stats['untranslated']} sentences could not be translated and are shown "
+                                f"in the original language.")
+                     if stats["errors"]:
+                         warning += f" Error: {'; '.join(stats['errors'])}"
+                     st.warning(warning)
+                 
+                 st.markdown("#### Executive Summary")
+                 st.write(translated["summary"])
+                 st.markdown("#### Key Obligations")
+                 for ob in translated["key_obligations"]:
+                     st.write(f"- {ob}")
+                 st.markdown("#### Clause Explanations")
+                 for clause_id, explanation in translated["clauses"]:
+                     st.markdown(f"**Clause {clause_id}:** {explanation}")
 
 def render_chat():
     st.title("Legal Chat Assistant")
@@ -223,7 +258,7 @@ def render_chat():
     if user_input:
         if st.session_state.get("contract_text"):
             with st.spinner("Consulting AI..."):
-                llm = LLMService()
+                llm = get_llm()
                 response = llm.chat_about_contract(st.session_state["contract_text"], user_input)
                 st.markdown(f"**AI:** {response}")
         else:
@@ -294,7 +329,7 @@ elif page == "Similarity Check":
     if st.button("Compare Clauses"):
         if actual_text:
             with st.spinner("Comparing..."):
-                llm = LLMService()
+                llm = get_llm()
                 comparison = llm.compare_clause_with_standard(actual_text, standard_text)
                 
                 if "error" in comparison:
@@ -0,0 +1,52 @@
+"""
+Runs the benchmark suite and checks it against the stored baseline.
+
+    python -m benchmarks                  # run and compare with baseline.json
+    python -m benchmarks --save-baseline  # run and store the results as the new baseline
+    python -m benchmarks -k parse         # only cases whose name contains "parse"
+
+Exits with status 1 if any case is slower than its threshold allows.
+"""
+import argparse
+import sys
+
+from benchmarks import (bench_classifier, bench_clause_index, bench_docx, bench_memory,  # noqa: F401  (registers cases)
+                        bench_pipeline, bench_responses)
+from benchmarks.harness import (CASES, DEFAULT_THRESHOLD, compare, format_value,
+                                load_baseline, run_case, save_baseline)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ContractAI benchmark suite")
+    parser.add_argument("-k", dest="pattern", default="", help="only run cases whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="max allowed ratio to baseline (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in CASES:
+        if args.pattern in case.name:
+            print(f"running {case.name}...", end="\r", file=sys.stderr)
+            results.append(run_case(case))
+
+    regressions = [] if args.save_baseline else compare(results, load_baseline(), args.threshold)
+    for result in results:
+        if result["status"] == "skipped":
+            print(f"{result['name']:<40} skipped ({result['reason']})")
+            continue
+        line = f"{result['name']:<40} {format_value(result['value'], result['unit']):>12}"
+        if "ratio" in result:
+            line += f"  {result['ratio']:.2f}x baseline"
+        if result.get("regression"):
+            line += "  REGRESSION"
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"Saved baseline for {sum(r['status'] == 'ok' for r in results)} cases.")
+        return 0
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Clause-type classifier: training time, classification time per contract size,
+and the estimated prompt tokens sent per contract with and without type routing.
+"""
+from benchmarks.harness import benchmark, measure
+from benchmarks.synthetic import generate_contract
+from src.backends import FakeBackend
+from src.clause_classifier import ClauseClassifier, get_clause_classifier
+from src.clause_fixtures import training_examples
+from src.llm import LLMService
+from src.nlp import split_into_clauses
+
+SIZES = (100, 500, 2000)
+
+
+@benchmark("clause_classifier[train]", setup=training_examples, repeat=3)
+def bench_train(examples):
+    ClauseClassifier().fit(examples)
+
+
+def _register(size):
+    def setup():
+        return get_clause_classifier(), split_into_clauses(generate_contract(size))
+
+    @benchmark(f"clause_classifier[classify-{size}]", setup=setup)
+    def bench_classify(args):
+        classifier, clauses = args
+        classifier.classify(clauses)
+
+
+def _prompt_tokens(size, routed):
+    """Estimated prompt tokens actually sent to analyze a synthetic contract's clauses."""
+    clauses = split_into_clauses(generate_contract(size))
+    classifications = get_clause_classifier().classify(clauses) if routed else None
+    llm = LLMService(backend=FakeBackend())
+    llm.batch_analyze_clauses(clauses, classifications=classifications)
+    return llm.stats["prompt_tokens"]
+
+
+def _register_tokens(size):
+    @measure(f"clause_prompt_tokens[generic-{size}]", unit="tokens")
+    def bench_generic():
+        return _prompt_tokens(size, routed=False)
+
+    @measure(f"clause_prompt_tokens[routed-{size}]", unit="tokens")
+    def bench_routed():
+        return _prompt_tokens(size, routed=True)
+
+
+for _size in SIZES:
+    _register(_size)
+_register_tokens(100)
@@ -0,0 +1,56 @@
+"""
+Clause index benchmarks: lookup latency against populated indexes of two
+sizes, which should stay about the same, and indexing throughput.
+"""
+import itertools
+import random
+
+from benchmarks.harness import benchmark
+from benchmarks.synthetic import CLAUSE_POOL
+from src.clause_index import ClauseIndex
+
+INDEX_SIZES = (10000, 100000)
+FILLER = "party shall agreement notice term payment confidential information company employee".split()
+
+
+def _edited(text, rng, edits=2):
+    """The clause with a few words replaced, as contracts reuse clauses with small edits."""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(FILLER)
+    return " ".join(words)
+
+
+def _corpus(size, rng):
+    clauses = []
+    for i in range(size):
+        heading, body = CLAUSE_POOL[i % len(CLAUSE_POOL)]
+        clauses.append((_edited(body, rng, edits=6) + f" Schedule {i}.", {"risk_score": 5}, f"contract-{i // 20}", heading))
+    return clauses
+
+
+def _register_lookup(size):
+    def setup():
+        rng = random.Random(0)
+        index = ClauseIndex()
+        index.add_many(_corpus(size, rng))
+        queries = itertools.cycle([_edited(body, rng) for _, body in CLAUSE_POOL])
+        return index, queries
+
+    @benchmark(f"clause_index_lookup[{size}]", setup=setup)
+    def bench_lookup(args):
+        index, queries = args
+        index.find_analysis(next(queries))
+
+
+for _size in INDEX_SIZES:
+    _register_lookup(_size)
+
+
+def _add_setup():
+    return _corpus(200, random.Random(1))
+
+
+@benchmark("clause_index_add[200]", setup=_add_setup, repeat=3)
+def bench_add(clauses):
+    ClauseIndex().add_many(clauses)
@@ -0,0 +1,55 @@
+"""
+Streaming DOCX extraction versus the python-docx object model it replaced,
+on the bundled templates and a large synthetic agreement: time and peak memory.
+"""
+import io
+import os
+import tracemalloc
+
+from benchmarks.harness import benchmark, measure
+from benchmarks.synthetic import generate_contract, to_docx
+from src.parser import extract_text_from_docx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCUMENTS = {
+    "nda_template": lambda: open(os.path.join(ROOT, "Non Disclosure Agreement (1).docx"), "rb").read(),
+    "employment_template": lambda: open(os.path.join(ROOT, "Employment Agreement template.docx"), "rb").read(),
+    "synthetic_2000": lambda: to_docx(generate_contract(2000)),
+}
+
+
+def python_docx_text(file_bytes):
+    """The previous implementation: build the full document model, keep body paragraphs only."""
+    import docx
+    doc = docx.Document(io.BytesIO(file_bytes))
+    return "".join(para.text + "\n" for para in doc.paragraphs)
+
+
+def peak_bytes(fn, data):
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _register(name, load):
+    @benchmark(f"docx_extract[python-docx-{name}]", setup=load, repeat=3)
+    def bench_python_docx(data):
+        python_docx_text(data)
+
+    @benchmark(f"docx_extract[streaming-{name}]", setup=load, repeat=3)
+    def bench_streaming(data):
+        extract_text_from_docx(data)
+
+    @measure(f"docx_peak_memory[python-docx-{name}]", setup=load)
+    def mem_python_docx(data):
+        return peak_bytes(python_docx_text, data)
+
+    @measure(f"docx_peak_memory[streaming-{name}]", setup=load)
+    def mem_streaming(data):
+        return peak_bytes(extract_text_from_docx, data)
+
+
+for _name, _load in DOCUMENTS.items():
+    _register(_name, _load)
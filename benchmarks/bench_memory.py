@@ -0,0 +1,121 @@
+"""
+Per-session memory footprint of an analysis result: the old dict layout versus
+the compact AnalysisResult model, both in memory and serialized. Also the peak
+memory of parsing an upload that is already in memory versus one streamed in
+and spooled by parse_document.
+"""
+import gc
+import io
+import pickle
+import tracemalloc
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import generate_contract, make_upload
+from src.models import AnalysisResult
+from src.nlp import split_into_clauses
+from src.parser import parse_document
+
+SIZES = (100, 500)
+
+
+def _pipeline_outputs(size):
+    """Text, entities, summary, clauses and clause analyses as the pipeline produces them."""
+    text = generate_contract(size)
+    clauses = split_into_clauses(text)
+    analyses = [{
+        "id": c["id"],
+        "explanation": f"Clause {c['id']} sets out the obligations of the parties.",
+        "risk_score": i % 10 + 1,
+        "risk_reason": f"Risk note for clause {c['id']}.",
+        "favorable": "Mutual",
+        "suggestion": "Limit the scope.",
+        "original_text": c["text"],
+    } for i, c in enumerate(clauses)]
+    entities = {"Parties": ["Acme Corp", "John Doe"], "Dates": ["1 January 2024"], "Money": ["$5,000"], "Locations": ["Mumbai"]}
+    summary = {"summary": "An agreement.", "contract_type": "NDA", "key_dates": [], "key_obligations": [],
+               "overall_risk": "Medium", "specific_risks": {}}
+    return text, entities, summary, clauses, analyses
+
+
+def build_dict(size):
+    text, entities, summary, _, analyses = _pipeline_outputs(size)
+    return {"text": text, "entities": entities, "summary": summary, "clauses": analyses,
+            "composite_risk": 55, "risk_level": "Medium"}
+
+
+def build_compact(size):
+    text, entities, summary, clauses, analyses = _pipeline_outputs(size)
+    return AnalysisResult.build(text, entities, summary, analyses, clauses, 55, "Medium")
+
+
+def retained_bytes(builder, size):
+    """Bytes still allocated after building a result and dropping the temporaries."""
+    gc.collect()
+    tracemalloc.start()
+    result = builder(size)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def _register(size):
+    @measure(f"session_memory[dict-{size}]")
+    def bench_dict():
+        return retained_bytes(build_dict, size)
+
+    @measure(f"session_memory[compact-{size}]")
+    def bench_compact():
+        return retained_bytes(build_compact, size)
+
+    @measure(f"session_serialized[pickle-dict-{size}]")
+    def bench_pickle():
+        return len(pickle.dumps(build_dict(size)))
+
+    @measure(f"session_serialized[compact-{size}]")
+    def bench_serialized():
+        return len(build_compact(size).to_bytes())
+
+
+for _size in SIZES:
+    _register(_size)
+
+
+class _Stream:
+    """A non-seekable upload stream (e.g. a request body), which parse_document has to spool."""
+
+    def __init__(self, data, name):
+        self.data = io.BytesIO(data)
+        self.name = name
+
+    def read(self, size=-1):
+        return self.data.read(size)
+
+
+def parse_peak(upload):
+    stats = {}
+    parse_document(upload, stats=stats, trace_memory=True)
+    return stats["peak_memory"]
+
+
+def _register_parse(file_format, size):
+    def in_memory():
+        return make_upload(size, file_format)
+
+    def streamed():
+        upload = make_upload(size, file_format)
+        return _Stream(upload.getvalue(), upload.name)
+
+    @measure(f"parse_peak_memory[{file_format}-{size}-in-memory]", setup=in_memory)
+    def bench_in_memory(upload):
+        return parse_peak(upload)
+
+    @measure(f"parse_peak_memory[{file_format}-{size}-spooled]", setup=streamed)
+    def bench_spooled(upload):
+        return parse_peak(upload)
+
+
+_register_parse("docx", 2000)
+_register_parse("txt", 2000)
+_register_parse("pdf", 10)  # tracemalloc makes pdfminer very slow; keep this one small
@@ -0,0 +1,119 @@
+"""
+Benchmarks for the parsing, NLP, risk, export and end-to-end analysis steps.
+"""
+from benchmarks.harness import SkipBenchmark, benchmark
+from benchmarks.synthetic import generate_contract, make_upload
+from src.backends import FakeBackend
+from src.clause_index import ClauseIndex
+from src.export import generate_pdf_report
+from src.llm import LLMService
+from src.nlp import extract_entities, split_into_clauses
+from src.parser import parse_document
+from src.pipeline import analyze_contract
+from src.risk import calculate_risk_score
+
+SIZES = (10, 100, 500)
+PDF_SIZES = (10, 100)  # pdfplumber is slow enough that 500 clauses dominates the run
+
+
+def _require_spacy_model():
+    import spacy.util
+    if not spacy.util.is_package("en_core_web_sm"):
+        raise SkipBenchmark("spacy model en_core_web_sm is not installed")
+    from src.nlp import load_nlp_model
+    load_nlp_model()
+
+
+def stub_entities(text):
+    """Stands in for spaCy entity extraction so the pipeline case runs without the model."""
+    return {"Parties": [], "Dates": [], "Money": [], "Locations": []}
+
+
+def run_pipeline(upload, llm, extract=extract_entities):
+    """Parses an upload and runs the app's analysis pipeline and PDF export on it."""
+    text = parse_document(upload)
+    result, _ = analyze_contract(text, llm, index=ClauseIndex(), contract=upload.name, extract=extract)
+    generate_pdf_report(result)
+    return result
+
+
+def _register_parse(file_format, size):
+    def setup():
+        return make_upload(size, file_format)
+
+    @benchmark(f"parse_document[{file_format}-{size}]", setup=setup, repeat=3 if file_format == "pdf" else 5)
+    def bench(upload):
+        upload.seek(0)
+        parse_document(upload)
+
+
+for _size in SIZES:
+    _register_parse("txt", _size)
+    _register_parse("docx", _size)
+for _size in PDF_SIZES:
+    _register_parse("pdf", _size)
+
+
+def _register_text_cases(size):
+    def text_setup():
+        return generate_contract(size)
+
+    def entity_setup():
+        _require_spacy_model()
+        return generate_contract(size)
+
+    @benchmark(f"split_into_clauses[{size}]", setup=text_setup)
+    def bench_split(text):
+        split_into_clauses(text)
+
+    @benchmark(f"extract_entities[{size}]", setup=entity_setup, repeat=3)
+    def bench_entities(text):
+        extract_entities(text)
+
+
+for _size in SIZES:
+    _register_text_cases(_size)
+
+
+def _risk_setup():
+    return [{"risk_score": score % 11} for score in range(1000)]
+
+
+@benchmark("calculate_risk_score[1000]", setup=_risk_setup)
+def bench_risk(clauses):
+    calculate_risk_score(clauses, "Medium")
+
+
+def _report_setup():
+    llm = LLMService(backend=FakeBackend(seed=0))
+    text = generate_contract(100)
+    summary = llm.summarize_contract(text)
+    summary["summary"] = " ".join(text.split()[:100])
+    summary["key_obligations"] = [c["text"][:200] for c in split_into_clauses(text)[:20]]
+    return {"summary": summary, "composite_risk": 55, "risk_level": "Medium"}
+
+
+@benchmark("generate_pdf_report", setup=_report_setup)
+def bench_report(result):
+    generate_pdf_report(result)
+
+
+def _register_pipeline(file_format, size):
+    def setup():
+        _require_spacy_model()
+        return make_upload(size, file_format)
+
+    @benchmark(f"pipeline[{file_format}-{size}]", setup=setup, repeat=3)
+    def bench(upload):
+        upload.seek(0)
+        run_pipeline(upload, LLMService(backend=FakeBackend(seed=0)))
+
+    # Same pipeline with entity extraction stubbed, so it has a baseline without spaCy
+    @benchmark(f"pipeline_without_ner[{file_format}-{size}]", setup=lambda: make_upload(size, file_format), repeat=3)
+    def bench_without_ner(upload):
+        upload.seek(0)
+        run_pipeline(upload, LLMService(backend=FakeBackend(seed=0)), extract=stub_entities)
+
+
+for _format in ("txt", "docx", "pdf"):
+    _register_pipeline(_format, 100)
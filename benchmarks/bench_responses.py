@@ -0,0 +1,91 @@
+"""
+Malformed LLM responses: how many requests the repair and field-retry path
+needs compared with the original strict parsing, against a fake backend that
+returns fenced, trailing-comma, truncated and incomplete JSON.
+"""
+import itertools
+import json
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import generate_contract
+from src.backends import FakeBackend, default_fake_response
+from src.llm import LLMService
+from src.nlp import split_into_clauses
+from src.response_parser import loads_strict
+
+CONTRACTS = 20
+DEFECTS = ("clean", "fenced", "trailing_comma", "truncated", "missing_field", "clean")
+
+
+class MessyResponder:
+    """Wraps default_fake_response, damaging responses in a fixed rotation of DEFECTS."""
+
+    def __init__(self):
+        self.defects = itertools.cycle(DEFECTS)
+        self.responses = 0
+        self.strict_failures = 0
+
+    def __call__(self, messages, json_mode):
+        text = default_fake_response(messages, json_mode)
+        if json_mode:
+            text = self._damage(text, next(self.defects))
+            self.responses += 1
+            if loads_strict(text) is None:
+                self.strict_failures += 1
+        return text
+
+    @staticmethod
+    def _damage(text, defect):
+        if defect == "fenced":
+            return f"Here is the analysis:\n```json\n{text}\n```"
+        if defect == "trailing_comma":
+            return text[:-1] + ",}"
+        if defect == "truncated":
+            return text[:int(len(text) * 0.8)]
+        if defect == "missing_field":
+            data = json.loads(text)
+            target = data["clauses"][0] if data.get("clauses") else data
+            target.pop("favorable", None)
+            target.pop("summary", None)
+            return json.dumps(data)
+        return text
+
+
+def _run():
+    """Analyzes the synthetic contracts. Returns (LLMService stats, responder)."""
+    responder = MessyResponder()
+    llm = LLMService(backend=FakeBackend(responder=responder))
+    for seed in range(CONTRACTS):
+        text = generate_contract(20, seed=seed)
+        clauses = split_into_clauses(text)
+        llm.summarize_contract(text)
+        llm.batch_analyze_clauses(clauses)
+        llm.analyze_clause(clauses[-1]["text"])
+    return llm.stats, responder
+
+
+_RESULT = []
+
+
+def _result():
+    if not _RESULT:
+        _RESULT.append(_run())
+    return _RESULT[0]
+
+
+# Full retries: strict parsing would have re-sent every response it couldn't
+# parse; with repair only responses that stay unparseable need one.
+@measure(f"llm_full_retries[strict-{CONTRACTS}]", unit="requests")
+def bench_strict_full_retries():
+    return _result()[1].strict_failures
+
+
+@measure(f"llm_full_retries[repair-{CONTRACTS}]", unit="requests")
+def bench_repair_full_retries():
+    return _result()[0]["failed"]
+
+
+@measure(f"llm_field_retries[repair-{CONTRACTS}]", unit="requests")
+def bench_field_retries():
+    return _result()[0]["field_retries"]
+
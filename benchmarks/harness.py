@@ -0,0 +1,138 @@
+"""
+Minimal benchmark harness: a registry of cases, timing, stored baselines and
+regression checks. Cases register themselves with the @benchmark decorator.
+"""
+import json
+import math
+import os
+import platform
+import statistics
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 1.5  # fail if a case gets 50% slower than its baseline
+MIN_SAMPLE_SECONDS = 0.05
+
+CASES = []
+
+
+class SkipBenchmark(Exception):
+    """Raised from a setup function when a case can't run in this environment."""
+
+
+class Case:
+    def __init__(self, name, fn, setup, repeat, threshold, unit):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.repeat = repeat
+        self.threshold = threshold
+        self.unit = unit
+
+
+def benchmark(name, setup=None, repeat=5, threshold=None):
+    """
+    Registers a timed case. setup() runs once, untimed, and its return value
+    is passed to the benchmarked function.
+    """
+    def decorator(fn):
+        CASES.append(Case(name, fn, setup, repeat, threshold, "seconds"))
+        return fn
+    return decorator
+
+
+def measure(name, setup=None, threshold=None, unit="bytes"):
+    """
+    Registers a case that reports a value itself (e.g. bytes of memory)
+    instead of being timed. The function returns the measured value.
+    """
+    def decorator(fn):
+        CASES.append(Case(name, fn, setup, 1, threshold, unit))
+        return fn
+    return decorator
+
+
+def _time_case(case, arg):
+    """Returns (median, min) seconds per call, calibrating calls per sample."""
+    call = (lambda: case.fn(arg)) if case.setup else case.fn
+    start = time.perf_counter()
+    call()
+    first = time.perf_counter() - start
+    number = max(1, math.ceil(MIN_SAMPLE_SECONDS / first)) if first > 0 else 1000
+
+    samples = []
+    for _ in range(case.repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples), min(samples)
+
+
+def run_case(case):
+    """Runs one case. Returns a result dict with status ok or skipped."""
+    try:
+        arg = case.setup() if case.setup else None
+    except SkipBenchmark as e:
+        return {"name": case.name, "status": "skipped", "reason": str(e)}
+
+    if case.unit == "seconds":
+        median, best = _time_case(case, arg)
+        return {"name": case.name, "status": "ok", "unit": "seconds", "value": median, "min": best}
+    value = case.fn(arg) if case.setup else case.fn()
+    return {"name": case.name, "status": "ok", "unit": case.unit, "value": value}
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Stores ok results in the baseline file, keeping entries for cases that weren't run."""
+    stored = load_baseline(path)
+    stored.update({r["name"]: {"value": r["value"], "unit": r["unit"]} for r in results if r["status"] == "ok"})
+    data = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()},
+        "results": stored,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Annotates results with their ratio to the baseline.
+    Returns the list of results that exceed their threshold.
+    """
+    thresholds = {c.name: c.threshold for c in CASES}
+    regressions = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if result["status"] != "ok" or not base:
+            continue
+        if base["value"]:
+            result["ratio"] = result["value"] / base["value"]
+        elif result["value"]:
+            result["ratio"] = math.inf  # e.g. retries appearing where the baseline had none
+        else:
+            continue
+        limit = thresholds.get(result["name"]) or threshold
+        if result["ratio"] > limit:
+            result["regression"] = True
+            regressions.append(result)
+    return regressions
+
+
+def format_value(value, unit):
+    if unit == "seconds":
+        if value < 1e-3:
+            return f"{value * 1e6:.1f} us"
+        if value < 1:
+            return f"{value * 1e3:.2f} ms"
+        return f"{value:.2f} s"
+    if unit == "bytes":
+        return f"{value / 1024:.1f} KiB"
+    return f"{value:.3g} {unit}"
@@ -0,0 +1,95 @@
+"""
+Synthetic contract generators for the benchmarks.
+Contracts are assembled from the clauses in src/templates.py, renumbered and
+filled with parties, dates and amounts so the NLP steps have something to find.
+"""
+import io
+import random
+import re
+
+from src.templates import FULL_EMPLOYMENT_TEMPLATE, FULL_NDA_TEMPLATE, STANDARD_CLAUSES
+
+PARTIES = ["Acme Corp", "Globex Private Limited", "Initech Solutions", "Priya Sharma", "John Doe", "Umbrella Industries"]
+CITIES = ["Mumbai", "Bengaluru", "New Delhi", "Chennai", "Pune"]
+DATES = ["1 January 2024", "15 March 2024", "30 June 2025", "2023-10-01", "31 December 2026"]
+AMOUNTS = ["Rs. 5,00,000", "$5,000", "INR 1,20,000", "$250,000"]
+
+
+def _template_clauses():
+    """Returns (heading, body) pairs from every bundled template."""
+    clauses = []
+    for template in (FULL_NDA_TEMPLATE, FULL_EMPLOYMENT_TEMPLATE):
+        for block in re.split(r"\n\s*\n", template.strip()):
+            heading, _, body = block.partition("\n")
+            heading = re.sub(r"^\d+\.\s*", "", heading).strip()
+            clauses.append((heading, body.strip()))
+    for name, text in STANDARD_CLAUSES.items():
+        clauses.append((name + ".", " ".join(text.split())))
+    return clauses
+
+
+CLAUSE_POOL = _template_clauses()
+
+
+def generate_contract(num_clauses, seed=0):
+    """
+    Builds a contract with num_clauses numbered clauses.
+    The same (num_clauses, seed) always yields the same text.
+    """
+    rng = random.Random(seed)
+    party_a, party_b = rng.sample(PARTIES, 2)
+    lines = [
+        "AGREEMENT",
+        f"This Agreement is made on {rng.choice(DATES)} between {party_a} and {party_b} at {rng.choice(CITIES)}.",
+        "",
+    ]
+    for i in range(1, num_clauses + 1):
+        heading, body = rng.choice(CLAUSE_POOL)
+        body = (body.replace("[Start Date]", rng.choice(DATES))
+                    .replace("$[Amount]", rng.choice(AMOUNTS))
+                    .replace("[State]", rng.choice(CITIES))
+                    .replace("[Job Title]", "Senior Analyst"))
+        lines.append(f"{i}. {heading}")
+        lines.append(f"{body} This obligation binds {rng.choice([party_a, party_b])} from {rng.choice(DATES)}.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class SyntheticUpload(io.BytesIO):
+    """Stands in for Streamlit's UploadedFile (a BytesIO with a name)."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def to_txt(text):
+    return text.encode("utf-8")
+
+
+def to_docx(text):
+    import docx
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(text):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    for line in text.split("\n"):
+        pdf.multi_cell(0, 5, line.encode("latin-1", "replace").decode("latin-1"))
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def make_upload(num_clauses, file_format, seed=0):
+    """Returns an upload object holding a synthetic contract in the given format (pdf, docx, txt)."""
+    converters = {"txt": to_txt, "docx": to_docx, "pdf": to_pdf}
+    data = converters[file_format](generate_contract(num_clauses, seed))
+    return SyntheticUpload(data, f"synthetic_{num_clauses}.{file_format}")
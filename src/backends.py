@@ -0,0 +1,252 @@
+"""
+LLM backends used by LLMService.
+A backend takes chat messages and returns the completion text (or an iterator
+of text chunks when streaming). Besides Groq there is a record/replay backend
+for deterministic offline runs and a fake backend for load testing.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from src.response_parser import SCHEMAS
+
+DEFAULT_MODEL = "openai/gpt-oss-120b"
+
+
+class BackendError(Exception):
+    """Raised when a backend fails to produce a completion."""
+
+
+class RateLimitError(BackendError):
+    """Raised when a backend rejects a request for exceeding its rate limit."""
+
+
+class ReplayMissError(BackendError):
+    """Raised in replay mode when no recording exists for a request."""
+
+
+def _chunks(text, size=16):
+    """Splits text into stream-like chunks."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+class LLMBackend:
+    """Base class. Subclasses implement complete()."""
+
+    model = DEFAULT_MODEL
+
+    def complete(self, messages, json_mode=False, stream=False):
+        """
+        Returns the completion text for the given chat messages,
+        or an iterator of text chunks if stream is True.
+        """
+        raise NotImplementedError
+
+
+class GroqBackend(LLMBackend):
+    """
+    Calls the Groq chat completions API.
+    max_connections sizes the underlying HTTP connection pool; share one
+    instance between threads to reuse its connections.
+    """
+
+    def __init__(self, api_key, model=None, client=None, max_connections=None):
+        from groq import Groq
+        self.model = model or os.getenv("LLM_MODEL", DEFAULT_MODEL)
+        if client is None:
+            http_client = None
+            if max_connections:
+                import httpx
+                limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+                http_client = httpx.Client(limits=limits, timeout=httpx.Timeout(60.0, connect=10.0))
+            client = Groq(api_key=api_key, http_client=http_client)
+        self.client = client
+
+    def complete(self, messages, json_mode=False, stream=False):
+        kwargs = {"messages": messages, "model": self.model}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if stream:
+            kwargs["stream"] = True
+            completion = self.client.chat.completions.create(**kwargs)
+            return (chunk.choices[0].delta.content or "" for chunk in completion if chunk.choices)
+        completion = self.client.chat.completions.create(**kwargs)
+        return completion.choices[0].message.content
+
+
+class RecordReplayBackend(LLMBackend):
+    """
+    Records responses from another backend to disk and replays them.
+    Each request is keyed by a hash of (model, messages, json_mode), so a
+    replayed run is fully deterministic.
+
+    mode="record": call the inner backend and save every response.
+    mode="replay": serve saved responses only; unknown requests raise ReplayMissError.
+    mode="auto": replay if a recording exists, otherwise record.
+    """
+
+    def __init__(self, directory, mode="replay", inner=None):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        if mode != "replay" and inner is None:
+            raise ValueError("An inner backend is required to record responses.")
+        self.directory = directory
+        self.mode = mode
+        self.inner = inner
+        self.model = inner.model if inner else DEFAULT_MODEL
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, messages, json_mode):
+        payload = json.dumps({"model": self.model, "messages": messages, "json_mode": json_mode}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def complete(self, messages, json_mode=False, stream=False):
+        key = self._key(messages, json_mode)
+        path = self._path(key)
+
+        if self.mode != "record" and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["response"]
+        elif self.mode == "replay":
+            raise ReplayMissError(f"No recorded response for request {key[:12]}")
+        else:
+            text = self.inner.complete(messages, json_mode=json_mode)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model, "messages": messages, "json_mode": json_mode, "response": text}, f, indent=1)
+
+        return _chunks(text) if stream else text
+
+
+def default_fake_response(messages, json_mode):
+    """
+    Builds a plausible response for the prompts LLMService sends.
+    Batch clause and translation prompts get one entry per clause/segment;
+    other JSON prompts get every schema field so any of them validates.
+    """
+    if not json_mode:
+        return "Fake response."
+
+    clause = {"explanation": "Fake explanation.", "risk_score": 5, "risk_reason": "Fake risk reason.",
+              "favorable": "Mutual", "suggestion": "Fake suggestion."}
+    prompt = messages[-1]["content"]
+    if "SEGMENTS: " in prompt:
+        segments = json.loads(prompt.split("SEGMENTS: ", 1)[1].split("\n", 1)[0])
+        return json.dumps({"translations": [f"[Fake translation] {segment}" for segment in segments]})
+    if '"clauses"' in prompt:
+        # Generic entries are headed "Clause 1.:", compact routed ones start '1. "'
+        ids = re.findall(r'^\s*(?:Clause (.+?):$|(\S+) ")', prompt, flags=re.MULTILINE)
+        return json.dumps({"clauses": [dict(clause, id=generic or compact) for generic, compact in ids]})
+
+    response = dict(clause)
+    defaults = {str: "Fake", int: 50, list: [], dict: {}}
+    for schema in SCHEMAS.values():
+        for field, expected in schema["required"].items():
+            response.setdefault(field, defaults[expected])
+    response["overall_risk"] = "Medium"
+    return json.dumps(response)
+
+
+class FakeBackend(LLMBackend):
+    """
+    Offline backend for load testing. Simulates latency, rate limits and
+    random failures without touching the network.
+
+    Args:
+        responder: fn(messages, json_mode) -> str. Defaults to default_fake_response.
+        latency: "constant", "uniform" or "lognormal".
+        latency_ms: median latency in milliseconds.
+        latency_spread: uniform: +/- fraction of latency_ms; lognormal: sigma.
+        rate_limit: max requests per rate_window seconds (None = unlimited).
+        failure_rate: probability (0-1) that a request raises BackendError.
+        seed: seed for the latency/failure RNG, for reproducible runs.
+    """
+
+    def __init__(self, responder=None, latency="constant", latency_ms=0, latency_spread=0.5,
+                 rate_limit=None, rate_window=60.0, failure_rate=0.0, seed=None):
+        if latency not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.responder = responder or default_fake_response
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_times = deque()
+        self.stats = {"requests": 0, "completed": 0, "failed": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _sample_latency(self):
+        if self.latency == "uniform":
+            spread = self.latency_ms * self.latency_spread
+            return self.rng.uniform(self.latency_ms - spread, self.latency_ms + spread) / 1000
+        if self.latency == "lognormal" and self.latency_ms > 0:
+            return self.rng.lognormvariate(0, self.latency_spread) * self.latency_ms / 1000
+        return self.latency_ms / 1000
+
+    def _admit(self):
+        """Checks the rate limit and failure roll. Returns the latency to simulate."""
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.rate_limit is not None:
+                while self.request_times and now - self.request_times[0] >= self.rate_window:
+                    self.request_times.popleft()
+                if len(self.request_times) >= self.rate_limit:
+                    self.stats["rate_limited"] += 1
+                    raise RateLimitError("Fake backend: rate limit exceeded (429).")
+                self.request_times.append(now)
+            if self.rng.random() < self.failure_rate:
+                self.stats["failed"] += 1
+                raise BackendError("Fake backend: simulated failure (500).")
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            return max(0.0, self._sample_latency())
+
+    def complete(self, messages, json_mode=False, stream=False):
+        delay = self._admit()
+        try:
+            time.sleep(delay)
+            text = self.responder(messages, json_mode)
+        finally:
+            with self.lock:
+                self.stats["in_flight"] -= 1
+        with self.lock:
+            self.stats["completed"] += 1
+        return _chunks(text) if stream else text
+
+
+def get_backend(max_connections=None):
+    """
+    Builds the backend selected by the environment.
+        LLM_BACKEND=groq (default when GROQ_API_KEY is set), fake, record, replay or auto.
+        LLM_REPLAY_DIR: recordings directory for record/replay/auto (default "llm_recordings").
+        LLM_FAKE_LATENCY_MS / LLM_FAKE_FAILURE_RATE: fake backend settings.
+        max_connections: HTTP connection pool size for the Groq client.
+    Returns None when no backend is available (LLMService then runs in mock mode).
+    """
+    name = os.getenv("LLM_BACKEND", "groq").lower()
+    api_key = os.getenv("GROQ_API_KEY")
+
+    if name == "fake":
+        return FakeBackend(
+            latency="lognormal",
+            latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", "0")),
+            failure_rate=float(os.getenv("LLM_FAKE_FAILURE_RATE", "0")),
+        )
+    if name in ("record", "replay", "auto"):
+        inner = GroqBackend(api_key, max_connections=max_connections) if api_key else None
+        return RecordReplayBackend(os.getenv("LLM_REPLAY_DIR", "llm_recordings"), mode=name, inner=inner)
+    if name == "groq":
+        return GroqBackend(api_key, max_connections=max_connections) if api_key else None
+    raise ValueError(f"Unknown LLM_BACKEND: {name}")
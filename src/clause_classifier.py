@@ -0,0 +1,196 @@
+"""
+Local clause-type classifier used to route clauses to type-specific prompts.
+A multinomial logistic regression over hashed word unigrams, bigrams and
+heading words, trained with numpy on the fixtures in src/clause_fixtures.py.
+A whole contract is scored in one vectorized pass (a gather of weight rows
+and a segmented sum), so classification costs far less than one LLM call.
+Boilerplate types (severability, waiver, ...) are not sent to the LLM at all.
+"""
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from src.clause_fixtures import training_examples
+
+# Global classifier, trained on first use
+CLAUSE_CLASSIFIER = None
+CLAUSE_CLASSIFIER_LOCK = threading.Lock()
+
+# label: shown in the UI; substantive: sent to the LLM; focus: what the type-specific prompt asks about
+CLAUSE_TYPES = {
+    "indemnity": {"label": "Indemnity", "substantive": True,
+                  "focus": "who indemnifies whom, mutuality, cap"},
+    "limitation_of_liability": {"label": "Limitation of Liability", "substantive": True,
+                                "focus": "cap amount, excluded damages, carve-outs"},
+    "confidentiality": {"label": "Confidentiality", "substantive": True,
+                        "focus": "scope, exclusions, duration, return of information"},
+    "termination": {"label": "Termination", "substantive": True,
+                    "focus": "who may terminate, notice, cure period, exit payments"},
+    "payment": {"label": "Payment", "substantive": True,
+                "focus": "amounts, due dates, late interest, taxes"},
+    "non_compete": {"label": "Non-Compete / Non-Solicit", "substantive": True,
+                    "focus": "duration, territory, Section 27 enforceability"},
+    "intellectual_property": {"label": "Intellectual Property", "substantive": True,
+                              "focus": "ownership, assignment, licence scope"},
+    "dispute_resolution": {"label": "Governing Law / Disputes", "substantive": True,
+                           "focus": "governing law, forum, arbitration"},
+    "term": {"label": "Term / Renewal", "substantive": True,
+             "focus": "duration, auto-renewal, survival"},
+    "obligations": {"label": "Obligations", "substantive": True,
+                    "focus": "each party's duties, one-sided duties"},
+    "warranties": {"label": "Warranties", "substantive": True,
+                   "focus": "what is warranted, duration, remedies"},
+    "definitions": {"label": "Definitions", "substantive": True,
+                    "focus": "definitions that widen or narrow obligations"},
+    "relationship": {"label": "Relationship / Assignment", "substantive": True,
+                     "focus": "contractor status, agency, assignment"},
+    "severability": {"label": "Severability", "substantive": False},
+    "waiver": {"label": "Waiver", "substantive": False},
+    "entire_agreement": {"label": "Entire Agreement / Amendment", "substantive": False},
+    "notices": {"label": "Notices", "substantive": False},
+    "counterparts": {"label": "Counterparts / Execution", "substantive": False},
+    "interpretation": {"label": "Interpretation", "substantive": False},
+}
+# Used when no type is predicted confidently; gets the full generic prompt
+OTHER = "other"
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class ClauseClassifier:
+    """
+    Args:
+        dims: size of the hashed feature space (a power of two).
+        min_confidence: below this probability a clause is labelled "other".
+        skip_confidence: a non-substantive label needs at least this
+            probability before the clause is skipped.
+        skip_margin: ...and must beat the substantive types' combined
+            probability by this much. Risky terms written in boilerplate
+            wording ("if any provision is held unenforceable, the Employee
+            shall nevertheless be bound by a non-compete") score around 0.3-0.45
+            boilerplate with as much or more substantive probability; real
+            boilerplate scores 0.65 or more with at most 0.3 substantive.
+            Skipping wrongly hides a risk, analyzing wrongly costs some tokens.
+    """
+
+    def __init__(self, dims=1 << 16, min_confidence=0.15, skip_confidence=0.5, skip_margin=0.3):
+        if dims & (dims - 1):
+            raise ValueError("dims must be a power of two")
+        self.dims = dims
+        self.min_confidence = min_confidence
+        self.skip_confidence = skip_confidence
+        self.skip_margin = skip_margin
+        self.labels = list(CLAUSE_TYPES)
+        self.weights = np.zeros((dims, len(self.labels)), dtype=np.float32)
+        self.idf = np.ones(dims, dtype=np.float32)
+        self.hashes = {}
+
+    def _features(self, text):
+        """
+        Hashed feature ids of one clause; id 0 is the bias feature.
+        Words are cut to their first 6 letters so "terminate", "terminated"
+        and "termination" share features.
+        """
+        words = [w[:6] for w in WORD_PATTERN.findall(text.lower())]
+        first_line = text.strip().split("\n", 1)[0]
+        heading = [w[:6] for w in WORD_PATTERN.findall(first_line.lower())] if len(first_line) <= 80 else []
+        tokens = words + [a + " " + b for a, b in zip(words, words[1:])] + ["h:" + w for w in heading]
+
+        hashes = self.hashes
+        ids = [0]
+        for token in tokens:
+            h = hashes.get(token)
+            if h is None:
+                h = hashes[token] = (zlib.crc32(token.encode("utf-8")) % (self.dims - 1)) + 1
+            ids.append(h)
+        return ids
+
+    def _encode(self, texts):
+        """
+        Flattened sparse encoding of many texts: feature ids, their tf-idf
+        values (L2-normalized per text) and each text's offset.
+        """
+        ids, offsets = [], []
+        for text in texts:
+            offsets.append(len(ids))
+            ids.extend(self._features(text))
+        ids = np.asarray(ids, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        values = self.idf[ids]
+        norms = np.sqrt(np.add.reduceat(values * values, offsets))
+        values /= np.repeat(norms, np.diff(np.append(offsets, len(ids))))
+        return ids, values, offsets
+
+    def _scores(self, ids, values, offsets):
+        return np.add.reduceat(self.weights[ids] * values[:, None], offsets, axis=0)
+
+    def fit(self, examples, epochs=200, learning_rate=20.0, l2=1e-4):
+        """
+        Trains on (clause_type, text) pairs with full-batch gradient descent.
+        Only the weight rows of features that occur in the examples are trained.
+        """
+        targets = np.asarray([self.labels.index(label) for label, _ in examples])
+        texts = [text for _, text in examples]
+        document_frequency = np.zeros(self.dims, dtype=np.float32)
+        for text in texts:
+            document_frequency[np.unique(self._features(text))] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)).astype(np.float32) + 1
+        ids, values, offsets = self._encode(texts)
+        used, local_ids = np.unique(ids, return_inverse=True)
+        rows = np.repeat(np.arange(len(examples)), np.diff(np.append(offsets, len(ids))))
+        onehot = np.eye(len(self.labels), dtype=np.float32)[targets]
+
+        weights = np.zeros((len(used), len(self.labels)), dtype=np.float32)
+        for _ in range(epochs):
+            scores = np.add.reduceat(weights[local_ids] * values[:, None], offsets, axis=0)
+            probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - onehot)[rows] * (values / len(examples))[:, None]
+            gradient = np.stack([np.bincount(local_ids, weights=error[:, k], minlength=len(used))
+                                 for k in range(len(self.labels))], axis=1)
+            weights -= learning_rate * (gradient + l2 * weights)
+
+        self.weights[:] = 0
+        self.weights[used] = weights
+        return self
+
+    def predict_proba(self, texts):
+        """(len(texts), len(labels)) array of class probabilities."""
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        scores = self._scores(*self._encode(texts))
+        probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def classify(self, clauses):
+        """
+        Labels clauses from split_into_clauses in one pass.
+        Returns one dict per clause: {"type", "label", "confidence", "skip"}.
+        """
+        probs = self.predict_proba([c["text"] for c in clauses])
+        best = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(best)), best]
+        substantive = probs[:, [CLAUSE_TYPES[label]["substantive"] for label in self.labels]].sum(axis=1)
+        results = []
+        for label_index, p, q in zip(best.tolist(), confidence.tolist(), substantive.tolist()):
+            clause_type = self.labels[label_index] if p >= self.min_confidence else OTHER
+            info = CLAUSE_TYPES.get(clause_type, {"label": "Other", "substantive": True})
+            results.append({
+                "type": clause_type,
+                "label": info["label"],
+                "confidence": round(p, 3),
+                "skip": not info["substantive"] and p >= self.skip_confidence and p - q >= self.skip_margin,
+            })
+        return results
+
+
+def get_clause_classifier():
+    """Returns the shared classifier, training it on the clause fixtures on first use."""
+    global CLAUSE_CLASSIFIER
+    with CLAUSE_CLASSIFIER_LOCK:
+        if CLAUSE_CLASSIFIER is None:
+            CLAUSE_CLASSIFIER = ClauseClassifier().fit(training_examples())
+    return CLAUSE_CLASSIFIER
+
@@ -0,0 +1,265 @@
+"""
+Labelled clause fixtures for training the clause-type classifier.
+Hand-written examples per type, plus the bundled templates labelled by their
+headings, so the classifier sees both the house style and common variants.
+"""
+import re
+
+from src.templates import FULL_EMPLOYMENT_TEMPLATE, FULL_NDA_TEMPLATE, STANDARD_CLAUSES
+
+EXAMPLES = {
+    "indemnity": [
+        "Indemnification.\nThe Supplier shall indemnify and hold harmless the Buyer against all losses, damages, costs and expenses arising from any breach of this Agreement by the Supplier.",
+        "The Contractor agrees to defend, indemnify and hold harmless the Client, its officers and employees from any third-party claims resulting from the Contractor's negligence.",
+        "Each party shall indemnify the other against any claim that the services infringe the rights of a third party.",
+        "The Licensee shall keep the Licensor fully indemnified against all actions, proceedings, claims and demands brought by any person in connection with the Licensee's use of the Software.",
+        "Indemnity.\nThe Vendor will reimburse the Company for all reasonable legal fees and settlement amounts incurred in defending any claim caused by the Vendor's wilful misconduct.",
+        "The Tenant shall indemnify the Landlord against all liabilities arising out of any injury to persons or damage to property occurring within the Premises.",
+        "The Employee shall indemnify the Company for any loss caused to the Company through the Employee's fraud or gross negligence.",
+        "The indemnifying party shall have sole control of the defence and settlement of any indemnified claim, and the indemnified party shall provide reasonable cooperation at the indemnifying party's expense.",
+        "The Service Provider shall compensate the Client for any penalty imposed by a regulator as a result of the Service Provider's failure to comply with applicable law.",
+        "The Licensee's indemnification obligations shall not apply to claims arising from modifications made by the Licensor.",
+        "The Distributor shall hold the Manufacturer harmless from all product liability claims relating to products stored or handled improperly by the Distributor.",
+    ],
+    "limitation_of_liability": [
+        "Limitation of Liability.\nIn no event shall either party be liable for any indirect, incidental, special or consequential damages, including loss of profits or revenue.",
+        "The total aggregate liability of the Service Provider under this Agreement shall not exceed the fees paid by the Client in the twelve months preceding the claim.",
+        "Neither party excludes or limits liability for death or personal injury caused by its negligence, or for fraud.",
+        "The Company's maximum liability for any claim, whether in contract, tort or otherwise, shall be limited to Rs. 10,00,000.",
+        "Except for breach of confidentiality obligations, neither party shall be liable to the other for loss of business, goodwill or anticipated savings.",
+        "Liability Cap.\nThe Supplier's liability for all claims arising under or in connection with this Agreement is capped at the total contract value.",
+        "The Licensor shall not be responsible for any loss of data or business interruption, howsoever caused.",
+        "Neither party shall be liable for any special, punitive or exemplary damages, even if advised of the possibility of such damages.",
+        "The limitations in this clause shall not apply to a party's indemnification obligations or to its liability for breach of confidentiality.",
+        "The Contractor's liability for delay shall be limited to liquidated damages of 0.5% of the contract price per week, up to a maximum of 10%.",
+    ],
+    "confidentiality": [
+        "Confidentiality.\nEach party shall keep confidential all information disclosed by the other party and shall not disclose it to any third party without prior written consent.",
+        "The Consultant shall not, during or after the term of engagement, use or disclose any trade secrets or proprietary information of the Company.",
+        "Confidential Information does not include information that is already in the public domain or was lawfully received from a third party without restriction.",
+        "The Receiving Party shall protect the Disclosing Party's confidential information using at least the same degree of care it uses for its own confidential information.",
+        "Upon termination, the Recipient shall promptly return or destroy all documents containing Confidential Information and certify such destruction in writing.",
+        "Non-Disclosure.\nThe Employee shall not divulge any information relating to the business, customers or finances of the Company to any person.",
+        "Disclosure of Confidential Information is permitted to the extent required by law or by order of a court, provided that prompt notice is given to the Disclosing Party.",
+        "The obligations of confidentiality under this clause shall survive for a period of five years after the expiry of this Agreement.",
+        "The parties shall keep the terms of this Agreement and all commercial information exchanged under it strictly confidential.",
+        "The Recipient may disclose confidential information only to its employees and advisers who need to know it and who are bound by equivalent obligations of secrecy.",
+        "All know-how, customer lists and pricing information of the Company shall be treated as secret and proprietary.",
+    ],
+    "termination": [
+        "Termination.\nEither party may terminate this Agreement by giving sixty days' written notice to the other party.",
+        "The Company may terminate this Agreement with immediate effect if the Contractor commits a material breach and fails to remedy it within thirty days of notice.",
+        "This Agreement shall terminate automatically if either party becomes insolvent, enters liquidation or has a receiver appointed over its assets.",
+        "Upon termination for any reason, the Client shall pay all fees accrued up to the date of termination.",
+        "Termination for Cause.\nThe Employer may dismiss the Employee without notice for gross misconduct, dishonesty or wilful neglect of duties.",
+        "The Landlord may re-enter the Premises and terminate the lease if the rent remains unpaid for forty-five days after it falls due.",
+        "Either party may end this Agreement for convenience at any time on ninety days' prior written notice.",
+        "The Employee may resign by giving one month's notice in writing, or salary in lieu of notice.",
+        "The Client may cancel any purchase order before dispatch without liability.",
+        "Termination of this Agreement shall not affect any rights or remedies that have accrued up to the date of termination.",
+        "On expiry or termination, the Licensee shall immediately cease all use of the Software and uninstall all copies.",
+    ],
+    "payment": [
+        "Payment Terms.\nThe Client shall pay each invoice within thirty days of receipt by bank transfer to the account nominated by the Supplier.",
+        "The Company shall pay the Consultant a fee of Rs. 50,000 per month, plus applicable GST.",
+        "Late payments shall carry interest at the rate of 18% per annum from the due date until the date of actual payment.",
+        "The Employee shall receive a monthly gross salary of INR 1,20,000, subject to deduction of tax at source.",
+        "Fees.\nAll fees are exclusive of taxes, which shall be borne by the Customer.",
+        "The Buyer shall pay an advance of 30% of the purchase price on signing, and the balance on delivery.",
+        "The Tenant shall pay a monthly rent of Rs. 45,000 on or before the fifth day of each calendar month, together with a refundable security deposit of three months' rent.",
+        "The Company shall reimburse reasonable travel and out-of-pocket expenses incurred by the Consultant with prior approval.",
+        "Benefits.\nThe Employee shall be entitled to medical insurance, provident fund contributions and twenty days of paid leave per year.",
+        "The Purchaser shall pay the Consideration in three equal instalments on the dates set out in Schedule 2.",
+        "The Company may deduct from the Employee's salary any amounts owed by the Employee to the Company.",
+        "Invoices disputed in good faith may be withheld, and the undisputed portion shall be paid by the due date.",
+        "A joining bonus of Rs. 2,00,000 shall be paid with the first month's salary and is repayable if the Employee leaves within one year.",
+    ],
+    "non_compete": [
+        "Non-Competition.\nFor a period of two years after termination, the Employee shall not engage in any business that competes with the Company in India.",
+        "The Seller shall not, for three years after Completion, carry on any business similar to the Business within the Territory.",
+        "Non-Solicitation.\nThe Consultant shall not solicit or entice away any employee or customer of the Company during the term and for twelve months thereafter.",
+        "During the term of employment the Employee shall not take up any other employment or consultancy without the written consent of the Company.",
+        "The Distributor shall not sell, market or distribute products that compete with the Products during the Term.",
+        "The Partner agrees not to approach any client introduced by the Firm for a period of eighteen months after leaving the Firm.",
+        "The Promoters shall not, directly or indirectly, hold any interest in a competing business for so long as they remain shareholders.",
+        "For twelve months after the end of the engagement, the Consultant shall not provide similar services to any competitor of the Company named in Schedule 3.",
+        "The Franchisee shall not operate any other restaurant business within a radius of five kilometres of the Outlet.",
+    ],
+    "intellectual_property": [
+        "Intellectual Property.\nAll intellectual property rights in the deliverables created under this Agreement shall vest in the Client upon payment.",
+        "The Employee hereby assigns to the Company all rights, title and interest in any inventions, works or designs made in the course of employment.",
+        "The Licensor grants the Licensee a non-exclusive, non-transferable licence to use the Software for its internal business purposes.",
+        "Each party retains ownership of its pre-existing intellectual property, and nothing in this Agreement transfers such rights.",
+        "The Contractor shall not use the Company's trademarks, logos or trade names without prior written approval.",
+        "Ownership of Work Product.\nAll copyright in reports, source code and documentation produced by the Consultant shall belong to the Company as works made for hire.",
+        "The Supplier warrants that the Products do not infringe any patent, copyright or other intellectual property right of any third party.",
+        "The Client grants the Agency a limited licence to use the Client's brand assets solely to perform the Services.",
+        "Any improvements to the Licensed Technology made by the Licensee shall be owned by the Licensor.",
+        "The Author waives all moral rights in the Work to the extent permitted by law.",
+    ],
+    "dispute_resolution": [
+        "Governing Law.\nThis Agreement shall be governed by and construed in accordance with the laws of India.",
+        "Any dispute arising out of or in connection with this Agreement shall be referred to arbitration under the Arbitration and Conciliation Act, 1996, by a sole arbitrator appointed by mutual consent.",
+        "The courts at Mumbai shall have exclusive jurisdiction over all matters arising under this Agreement.",
+        "Dispute Resolution.\nThe parties shall first attempt to resolve any dispute amicably through negotiation between senior executives for thirty days before commencing proceedings.",
+        "The seat of arbitration shall be New Delhi and the proceedings shall be conducted in English.",
+        "Jurisdiction.\nThe parties submit to the exclusive jurisdiction of the courts of Bengaluru, Karnataka.",
+        "Any claim or controversy shall be finally settled by binding arbitration administered by the Mumbai Centre for International Arbitration.",
+        "Nothing in this clause prevents either party from seeking urgent injunctive relief from a court of competent jurisdiction.",
+        "This Agreement and any non-contractual obligations arising from it are governed by the laws of the Republic of India.",
+    ],
+    "term": [
+        "Term.\nThis Agreement shall commence on the Effective Date and remain in force for a period of three years.",
+        "This Agreement shall automatically renew for successive one-year periods unless either party gives notice of non-renewal at least sixty days before the end of the then-current term.",
+        "The lease shall be for a period of eleven months commencing from 1 April 2024, renewable by mutual consent.",
+        "Duration.\nThe engagement shall begin on the Start Date and continue until completion of the Services, unless terminated earlier.",
+        "The Employee shall be on probation for a period of six months from the date of joining, which may be extended at the discretion of the Company.",
+        "The provisions of this Agreement relating to confidentiality and indemnity shall survive its expiry or termination.",
+        "This Agreement shall remain valid for a period of five years from the Effective Date and may be extended by written agreement.",
+        "Unless terminated earlier, the licence shall expire at the end of the Initial Term.",
+        "The tenancy shall commence on the Rent Commencement Date and end on the date falling thirty-six months thereafter.",
+    ],
+    "obligations": [
+        "Scope of Services.\nThe Service Provider shall provide the services described in Schedule A in a professional and workmanlike manner.",
+        "The Employee shall devote their full working time and attention to the business of the Company and perform the duties assigned by the Board.",
+        "The Supplier shall deliver the Goods to the Buyer's warehouse in Pune within fourteen days of each purchase order.",
+        "The Contractor shall comply with all applicable laws, regulations and the Client's site safety policies while performing the Works.",
+        "The Tenant shall keep the Premises in good repair and shall not make structural alterations without the Landlord's consent.",
+        "Duties.\nThe Consultant shall attend weekly progress meetings and submit monthly reports on the status of the project.",
+        "The Company shall provide the Employee with the equipment and access reasonably required to perform the role.",
+        "The Licensee shall maintain accurate records of its use of the Software and permit audits on reasonable notice.",
+        "The Customer shall provide timely access to its premises, systems and personnel as reasonably required by the Supplier.",
+        "The Agent shall use its best endeavours to promote and sell the Products in the Territory.",
+        "The Employee shall comply with the Company's code of conduct and all policies as amended from time to time.",
+    ],
+    "warranties": [
+        "Representations and Warranties.\nEach party represents and warrants that it has full power and authority to enter into and perform this Agreement.",
+        "The Supplier warrants that the Goods shall be free from defects in materials and workmanship for a period of twelve months from delivery.",
+        "The Seller represents that it has good and marketable title to the Shares, free from all encumbrances.",
+        "Except as expressly set out in this Agreement, all warranties, conditions and representations, whether express or implied, are excluded to the fullest extent permitted by law.",
+        "The Consultant warrants that the Services will be performed with reasonable skill, care and diligence.",
+        "The Company represents that all information provided in the disclosure schedule is true, accurate and complete.",
+        "The Licensor does not warrant that the Software will be error-free or that its operation will be uninterrupted.",
+        "Each party warrants that the execution of this Agreement does not breach any other agreement to which it is a party.",
+        "If the Goods do not conform to the warranty, the Supplier shall at its option repair or replace them free of charge.",
+    ],
+    "definitions": [
+        "Definitions.\nIn this Agreement, \"Affiliate\" means any entity that directly or indirectly controls, is controlled by or is under common control with a party.",
+        "\"Business Day\" means a day other than a Saturday, Sunday or public holiday in Mumbai.",
+        "\"Effective Date\" means the date on which this Agreement is signed by the last of the parties.",
+        "Definitions and Interpretation.\nCapitalised terms used in this Agreement shall have the meanings given to them in this clause.",
+        "\"Services\" means the services to be provided by the Service Provider as described in Schedule 1, as amended from time to time.",
+        "\"Deliverables\" means all documents, products and materials developed by the Contractor as part of the Services.",
+        "\"Confidential Information\" means all information, in any form, disclosed by one party to the other under this Agreement.",
+        "\"Intellectual Property Rights\" means patents, copyrights, trademarks, designs, trade secrets and all similar rights anywhere in the world.",
+        "\"Change of Control\" means any transaction by which a person acquires more than 50% of the voting shares of a party.",
+    ],
+    "relationship": [
+        "Relationship of the Parties.\nThe Contractor is an independent contractor and nothing in this Agreement shall create a relationship of employer and employee.",
+        "Nothing in this Agreement shall constitute a partnership or joint venture between the parties or make either party the agent of the other.",
+        "Neither party shall have authority to bind the other or to incur any obligation on its behalf.",
+        "Assignment.\nNeither party may assign or transfer its rights under this Agreement without the prior written consent of the other party.",
+        "The Consultant shall be solely responsible for the payment of its own taxes and statutory contributions.",
+        "The Supplier may not subcontract any of its obligations without the Buyer's prior written approval.",
+        "The Company may assign this Agreement to any of its Affiliates or to a purchaser of all or substantially all of its assets.",
+        "Nothing in this Agreement creates any right enforceable by a person who is not a party to it.",
+        "The Agent is not authorised to enter into contracts on behalf of the Principal.",
+    ],
+    "severability": [
+        "Severability.\nIf any provision of this Agreement is held invalid or unenforceable, the remaining provisions shall continue in full force and effect.",
+        "Should any clause of this Agreement be found void by a court of competent jurisdiction, that clause shall be severed and the rest of the Agreement shall remain valid.",
+        "If any term is found to be illegal, the parties shall negotiate in good faith a valid replacement provision that comes closest to the original intention.",
+        "The invalidity of any part of this Agreement shall not affect the validity of the remainder.",
+        "Severance.\nAny provision that is unenforceable in any jurisdiction shall be ineffective only to the extent of such unenforceability.",
+        "If any provision is declared void, it shall be deemed modified to the minimum extent necessary to make it valid, and the remaining provisions shall not be affected.",
+        "Each provision of this Agreement is separate and severable, and the unenforceability of one shall not impair the others.",
+    ],
+    "waiver": [
+        "Waiver.\nNo failure or delay by either party in exercising any right shall operate as a waiver of that right.",
+        "A waiver of any breach of this Agreement shall not be deemed a waiver of any subsequent breach.",
+        "No waiver shall be effective unless made in writing and signed by the waiving party.",
+        "The single or partial exercise of any right or remedy shall not preclude any further exercise of that right or any other remedy.",
+        "No Waiver.\nForbearance or indulgence by a party shall not prejudice or restrict its rights under this Agreement.",
+        "Any waiver granted by a party shall apply only to the specific instance and purpose for which it is given.",
+        "The rights and remedies of the parties are cumulative and not exclusive of any rights or remedies provided by law, and no delay shall operate as a waiver.",
+    ],
+    "entire_agreement": [
+        "Entire Agreement.\nThis Agreement constitutes the entire agreement between the parties and supersedes all prior negotiations, understandings and agreements.",
+        "This Agreement may only be amended or varied by a written instrument signed by authorised representatives of both parties.",
+        "Each party acknowledges that it has not relied on any statement or representation not expressly set out in this Agreement.",
+        "Amendment.\nNo variation of this Agreement shall be effective unless it is in writing and signed by the parties.",
+        "This Agreement, together with its schedules, sets out the whole understanding of the parties relating to its subject matter.",
+        "This Agreement supersedes the memorandum of understanding dated 1 March 2023 between the parties.",
+        "In the event of any conflict between this Agreement and any purchase order, the terms of this Agreement shall prevail.",
+    ],
+    "notices": [
+        "Notices.\nAll notices under this Agreement shall be in writing and delivered by hand, registered post or email to the addresses set out above.",
+        "A notice sent by email shall be deemed received at the time of transmission, and a notice sent by registered post shall be deemed received three days after posting.",
+        "Either party may change its address for notices by giving written notice to the other party.",
+        "Any notice to the Company shall be marked for the attention of the Legal Department at its registered office.",
+        "Notices shall be addressed to the Chief Executive Officer of the receiving party.",
+        "Any communication required to be given under this Agreement shall be sent to the email address of the recipient specified in Schedule 1.",
+        "Notice given by courier shall be deemed delivered on the second business day after dispatch.",
+    ],
+    "counterparts": [
+        "Counterparts.\nThis Agreement may be executed in any number of counterparts, each of which shall be deemed an original.",
+        "The parties agree that electronic signatures and signatures delivered by PDF shall be as valid as original signatures.",
+        "This Agreement may be signed in counterparts, which together shall constitute one and the same instrument.",
+        "Execution.\nThis Agreement has been executed by the duly authorised representatives of the parties on the date written above.",
+        "IN WITNESS WHEREOF the parties have signed this Agreement on the day and year first above written.",
+        "Signed for and on behalf of the Company by its authorised signatory in the presence of the witnesses named below.",
+        "This Agreement may be executed electronically, and a scanned copy of a signed counterpart shall be as effective as an original.",
+    ],
+    "interpretation": [
+        "Headings.\nThe headings in this Agreement are for convenience only and shall not affect its interpretation.",
+        "In this Agreement, words in the singular include the plural and references to one gender include all genders.",
+        "References to clauses and schedules are to the clauses of and schedules to this Agreement.",
+        "The words \"including\" and \"include\" shall be construed without limitation.",
+        "Any reference to a statute includes that statute as amended or re-enacted from time to time.",
+        "Unless the context otherwise requires, references to a person include a body corporate, firm or association.",
+        "The recitals and schedules form part of this Agreement and shall have effect as if set out in full in its body.",
+    ],
+}
+
+# Headings of the bundled template clauses, mapped to their type
+TEMPLATE_LABELS = {
+    "Definition of Confidential Information": "confidentiality",
+    "Exclusions from Confidential Information": "confidentiality",
+    "Obligations of Receiving Party": "confidentiality",
+    "Time Periods": "term",
+    "Relationships": "relationship",
+    "Severability": "severability",
+    "Integration": "entire_agreement",
+    "Waiver": "waiver",
+    "Employment": "obligations",
+    "Term": "term",
+    "Compensation": "payment",
+    "Duties and Responsibilities": "obligations",
+    "Benefits": "payment",
+    "Termination": "termination",
+    "Confidentiality": "confidentiality",
+    "Governing Law": "dispute_resolution",
+    "Entire Agreement": "entire_agreement",
+    "Indemnity": "indemnity",
+    "Termination for Convenience": "termination",
+    "Non-Compete": "non_compete",
+}
+
+
+def template_examples():
+    """(clause_type, text) pairs for the clauses of the bundled templates."""
+    examples = []
+    for template in (FULL_NDA_TEMPLATE, FULL_EMPLOYMENT_TEMPLATE):
+        for block in re.split(r"\n\s*\n", template.strip()):
+            heading, _, body = block.partition("\n")
+            heading = re.sub(r"^\d+\.\s*", "", heading).strip().rstrip(".")
+            examples.append((TEMPLATE_LABELS[heading], f"{heading}.\n{body.strip()}"))
+    for name, text in STANDARD_CLAUSES.items():
+        examples.append((TEMPLATE_LABELS[name], f"{name}.\n{' '.join(text.split())}"))
+    return examples
+
+
+def training_examples():
+    """All labelled (clause_type, text) pairs."""
+    examples = [(label, text) for label, texts in EXAMPLES.items() for text in texts]
+    return examples + template_examples()
@@ -0,0 +1,245 @@
+"""
+Persistent index over analyzed clauses: exact reuse plus near-duplicate lookup.
+A clause whose normalized text was analyzed before reuses that analysis as-is.
+Most contracts also reuse clauses with small edits, but a one-word edit such as
+"shall" -> "shall not" can flip a clause's meaning, so near-duplicates are only
+found to give the model a reference, never reused. Each clause is reduced to a
+MinHash signature over its word shingles; signatures are split into LSH bands
+stored in an indexed SQLite table. Boilerplate clauses pile up in the same band
+buckets, so each lookup reads at most `bucket_limit` rows per band (the oldest,
+which stand in for their near-duplicate group) and its cost stays flat as the
+corpus grows instead of scanning whole buckets.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+# Global clause index, opened on first use
+CLAUSE_INDEX = None
+CLAUSE_INDEX_LOCK = threading.Lock()
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, k=3):
+    """Returns the set of k-word shingles of the normalized text."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def text_hash(text):
+    """Hash of the clause text with case and whitespace normalized; equal hashes mean the same wording."""
+    return hashlib.sha1(" ".join(text.split()).casefold().encode("utf-8")).hexdigest()
+
+
+class ClauseIndex:
+    """
+    Args:
+        path: SQLite file for the index (":memory:" for a throwaway index).
+        num_perm: MinHash signature length.
+        bands: LSH bands; num_perm / bands rows per band. With 128/16 clauses
+            around 0.7 Jaccard similarity or above become candidates.
+        shingle_size: words per shingle. Short legal clauses need small shingles
+            for a one-word edit not to hide the match.
+        seed: fixes the hash permutations; must stay the same for a given index file.
+        bucket_limit: rows read per band bucket on lookup. Bounds lookup cost;
+            a clause only misses a near-duplicate if every band it shares with
+            it is already full of other near-duplicates.
+    """
+
+    def __init__(self, path=":memory:", num_perm=128, bands=16, shingle_size=3, seed=1, bucket_limit=32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.bucket_limit = bucket_limit
+
+        rng = np.random.RandomState(seed)
+        # a < 2^31 and 32-bit shingle hashes keep a*x+b inside uint64
+        self.perm_a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.perm_b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS clauses (
+                    id INTEGER PRIMARY KEY,
+                    contract TEXT,
+                    clause_id TEXT,
+                    text_hash TEXT,
+                    signature BLOB NOT NULL,
+                    analysis TEXT,
+                    occurrences INTEGER NOT NULL DEFAULT 1,
+                    reuse_count INTEGER NOT NULL DEFAULT 0
+                )""")
+            # Index files written before exact matching have no text hashes; their
+            # rows can still serve as references but are never reused as-is
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(clauses)")]
+            if "text_hash" not in columns:
+                self.conn.execute("ALTER TABLE clauses ADD COLUMN text_hash TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS clauses_text_hash ON clauses (text_hash)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, clause INTEGER NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+
+    def signature(self, text):
+        """MinHash signature of a clause as a uint32 array of length num_perm."""
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_size)), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.zeros(self.num_perm, dtype=np.uint32)
+        permuted = (np.outer(hashes, self.perm_a) + self.perm_b) % MERSENNE_PRIME
+        return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def band_keys(self, signature):
+        """One 63-bit key per band; the band number is mixed in so bands don't collide."""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8, person=band.to_bytes(2, "little")).digest()
+            keys.append(int.from_bytes(digest, "little") >> 1)
+        return keys
+
+    def add(self, text, analysis=None, contract=None, clause_id=None):
+        """Indexes a clause (and its analysis, if known). Returns its row id."""
+        return self.add_many([(text, analysis, contract, clause_id)])[0]
+
+    def add_many(self, items):
+        """
+        Indexes many clauses in one transaction.
+        items: iterable of (text, analysis, contract, clause_id). Returns the row ids.
+        A clause with the same normalized text as one already indexed is folded
+        into that entry instead of being stored again, so the index grows with
+        distinct clauses rather than with the corpus.
+        """
+        prepared = [(text_hash(text), self.signature(text), analysis, contract, clause_id)
+                    for text, analysis, contract, clause_id in items]
+
+        row_ids = []
+        with self.lock, self.conn:
+            for digest, signature, analysis, contract, clause_id in prepared:
+                row = self.conn.execute("SELECT id FROM clauses WHERE text_hash = ? LIMIT 1", (digest,)).fetchone()
+                if row is not None:
+                    row_id = row[0]
+                    self.conn.execute("UPDATE clauses SET occurrences = occurrences + 1 WHERE id = ?", (row_id,))
+                    if analysis is not None:
+                        self.conn.execute("UPDATE clauses SET analysis = COALESCE(analysis, ?) WHERE id = ?",
+                                          (json.dumps(analysis), row_id))
+                    row_ids.append(row_id)
+                    continue
+                cursor = self.conn.execute(
+                    "INSERT INTO clauses (contract, clause_id, text_hash, signature, analysis) VALUES (?, ?, ?, ?, ?)",
+                    (contract, clause_id, digest, signature.tobytes(),
+                     json.dumps(analysis) if analysis is not None else None))
+                row_id = cursor.lastrowid
+                self.conn.executemany("INSERT INTO bands (key, clause) VALUES (?, ?)",
+                                      [(key, row_id) for key in self.band_keys(signature)])
+                row_ids.append(row_id)
+        return row_ids
+
+    def _match(self, signature, limit):
+        """
+        Candidates sharing at least one band with the signature, ranked by how
+        many bands they share; the top `limit` are verified against their full
+        signatures. At most bucket_limit rows are read from each band bucket.
+        Caller holds the lock.
+        """
+        keys = self.band_keys(signature)
+        buckets = " UNION ALL ".join(["SELECT * FROM (SELECT clause FROM bands WHERE key = ? LIMIT ?)"] * len(keys))
+        params = []
+        for key in keys:
+            params += [key, self.bucket_limit]
+        rows = self.conn.execute(
+            f"""SELECT clauses.id, clauses.signature FROM clauses JOIN (
+                    SELECT clause, COUNT(*) AS shared FROM ({buckets})
+                    GROUP BY clause ORDER BY shared DESC LIMIT ?
+                ) AS candidates ON candidates.clause = clauses.id""",
+            params + [limit * 4]).fetchall()
+        if not rows:
+            return []
+        signatures = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.uint32).reshape(len(rows), self.num_perm)
+        similarities = (signatures == signature).mean(axis=1)
+        order = np.argsort(-similarities)[:limit]
+        return [(rows[i][0], float(similarities[i])) for i in order]
+
+    def query(self, text, limit=10):
+        """
+        Finds indexed clauses similar to text.
+        Returns up to `limit` (row_id, estimated_similarity) pairs, most similar first.
+        """
+        signature = self.signature(text)
+        with self.lock:
+            return self._match(signature, limit)
+
+    def find_analysis(self, text):
+        """
+        Returns (analysis, similarity, row_id, exact) for an analyzed clause
+        like text, or None. exact is True only when the normalized text is
+        identical; only then may the analysis be reused as-is, and only then
+        does the lookup count as a reuse. Otherwise the most similar analyzed
+        clause is returned as a reference for the model.
+        """
+        digest = text_hash(text)
+        signature = self.signature(text)
+        with self.lock, self.conn:
+            self.lookups += 1
+            row = self.conn.execute("SELECT id, analysis FROM clauses WHERE text_hash = ? AND analysis IS NOT NULL "
+                                    "LIMIT 1", (digest,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                self.conn.execute("UPDATE clauses SET reuse_count = reuse_count + 1 WHERE id = ?", (row[0],))
+                return json.loads(row[1]), 1.0, row[0], True
+            for row_id, similarity in self._match(signature, limit=10):
+                row = self.conn.execute("SELECT analysis FROM clauses WHERE id = ?", (row_id,)).fetchone()
+                if row[0] is not None:
+                    return json.loads(row[0]), similarity, row_id, False
+        return None
+
+    def stats(self, top=5):
+        """Reuse statistics across the indexed corpus."""
+        with self.lock:
+            distinct, occurrences, analyzed, reused = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(occurrences), 0), COUNT(analysis), COALESCE(SUM(reuse_count), 0) FROM clauses"
+            ).fetchone()
+            most_reused = self.conn.execute(
+                "SELECT id, contract, clause_id, occurrences, reuse_count FROM clauses WHERE occurrences + reuse_count > 1 "
+                "ORDER BY occurrences + reuse_count DESC LIMIT ?", (top,)).fetchall()
+            lookups, hits = self.lookups, self.hits
+        return {
+            "distinct_clauses": distinct,
+            "clause_occurrences": occurrences,
+            "duplicate_ratio": 1 - distinct / occurrences if occurrences else 0.0,
+            "analyzed": analyzed,
+            "analysis_reuses": reused,
+            "session_lookups": lookups,
+            "session_hits": hits,
+            "session_hit_rate": hits / lookups if lookups else 0.0,
+            "most_reused": [{"row_id": r[0], "first_seen_in": r[1], "clause_id": r[2], "occurrences": r[3],
+                             "analysis_reuses": r[4]} for r in most_reused],
+        }
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+
+
+def get_clause_index():
+    """Returns the shared clause index at CLAUSE_INDEX_PATH (default clause_index.db)."""
+    global CLAUSE_INDEX
+    with CLAUSE_INDEX_LOCK:
+        if CLAUSE_INDEX is None:
+            CLAUSE_INDEX = ClauseIndex(os.getenv("CLAUSE_INDEX_PATH", "clause_index.db"))
+    return CLAUSE_INDEX
@@ -0,0 +1,234 @@
+"""
+Process-wide LLM gateway shared by every Streamlit session.
+All requests go through one backend (and so one HTTP connection pool), a
+global token-bucket rate limiter and per-user fair queuing, so a burst from one
+user can't starve the others or blow through the provider rate limit.
+Identical in-flight prompts are coalesced into a single request.
+"""
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from src.backends import LLMBackend, get_backend
+
+# Global gateway instance, created on first use
+GATEWAY = None
+GATEWAY_LOCK = threading.Lock()
+
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` stored."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def release(self):
+        """Returns an unused token to the bucket."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class _Request:
+    __slots__ = ("user_id", "messages", "json_mode", "stream", "key", "future", "submitted")
+
+    def __init__(self, user_id, messages, json_mode, stream, key):
+        self.user_id = user_id
+        self.messages = messages
+        self.json_mode = json_mode
+        self.stream = stream
+        self.key = key
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+
+def _is_rate_limit_error(error):
+    # Covers both groq.RateLimitError and src.backends.RateLimitError
+    return type(error).__name__ == "RateLimitError"
+
+
+class LLMGateway:
+    """
+    Args:
+        backend: the shared LLMBackend all requests are sent to.
+        requests_per_minute: global rate limit across all users.
+        burst: how many requests may be sent back to back (bucket capacity).
+        workers: number of requests in flight at once.
+    """
+
+    def __init__(self, backend, requests_per_minute=30, burst=5, workers=8):
+        self.backend = backend
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.condition = threading.Condition()
+        self.queues = OrderedDict()  # user_id -> deque of _Request, in round-robin order
+        self.inflight = {}           # request key -> Future, for coalescing
+        self.waits = deque(maxlen=1000)
+        self.counters = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0,
+                         "rate_limit_retries": 0, "max_queue_depth": 0}
+        self.workers = [threading.Thread(target=self._worker, daemon=True, name=f"llm-gateway-{i}")
+                        for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, user_id, messages, json_mode=False, stream=False):
+        """
+        Queues a request and returns a Future for its result.
+        Non-streaming requests identical to one already queued or running
+        share that request's Future instead of being sent again.
+        """
+        key = None
+        if not stream:
+            payload = json.dumps({"messages": messages, "json_mode": json_mode}, sort_keys=True)
+            key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+        with self.condition:
+            self.counters["submitted"] += 1
+            if key in self.inflight:
+                self.counters["coalesced"] += 1
+                return self.inflight[key]
+
+            request = _Request(user_id, messages, json_mode, stream, key)
+            if key:
+                self.inflight[key] = request.future
+            self.queues.setdefault(user_id, deque()).append(request)
+            depth = self._queue_depth()
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], depth)
+            self.condition.notify()
+            return request.future
+
+    def _queue_depth(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def _next_request(self):
+        """Takes the next request, round-robin across users. Caller holds the lock."""
+        user_id, queue = next(iter(self.queues.items()))
+        request = queue.popleft()
+        if queue:
+            self.queues.move_to_end(user_id)
+        else:
+            del self.queues[user_id]
+        return request
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while not self.queues:
+                    self.condition.wait()
+
+            # Take the rate-limit token first and only then pick the request,
+            # so workers waiting on the bucket don't each hold a request picked
+            # while the queue still looked different (which defeats round-robin).
+            self.bucket.acquire()
+            with self.condition:
+                if not self.queues:
+                    # Another worker took the last request while we waited
+                    self.bucket.release()
+                    continue
+                request = self._next_request()
+                self.waits.append(time.monotonic() - request.submitted)
+
+            try:
+                result = self._send(request)
+            except Exception as e:
+                self._finish(request, error=e)
+            else:
+                self._finish(request, result=result)
+
+    def _send(self, request):
+        """Calls the backend, backing off and retrying if the provider rate-limits us."""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                return self.backend.complete(request.messages, json_mode=request.json_mode, stream=request.stream)
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                with self.condition:
+                    self.counters["rate_limit_retries"] += 1
+                time.sleep(2 ** attempt)
+                self.bucket.acquire()
+
+    def _finish(self, request, result=None, error=None):
+        with self.condition:
+            if request.key:
+                self.inflight.pop(request.key, None)
+            self.counters["failed" if error else "completed"] += 1
+        if error:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
+
+    def metrics(self):
+        """Snapshot of queue depth, wait times (seconds) and request counters."""
+        with self.condition:
+            waits = sorted(self.waits)
+            snapshot = dict(self.counters)
+            snapshot["queue_depth"] = self._queue_depth()
+            snapshot["queued_users"] = len(self.queues)
+            snapshot["in_flight"] = len(self.inflight)
+        snapshot["avg_wait"] = statistics.mean(waits) if waits else 0.0
+        snapshot["p95_wait"] = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        snapshot["max_wait"] = waits[-1] if waits else 0.0
+        return snapshot
+
+
+class GatewayBackend(LLMBackend):
+    """Per-user handle on the shared gateway, usable anywhere a backend is."""
+
+    def __init__(self, gateway, user_id):
+        self.gateway = gateway
+        self.user_id = user_id
+        self.model = gateway.backend.model
+
+    def complete(self, messages, json_mode=False, stream=False):
+        return self.gateway.submit(self.user_id, messages, json_mode=json_mode, stream=stream).result()
+
+
+def get_gateway():
+    """
+    Returns the process-wide gateway, creating it on first use.
+    Configured with LLM_RATE_PER_MINUTE, LLM_BURST and LLM_GATEWAY_WORKERS.
+    Returns None when no backend is available (mock mode).
+    """
+    global GATEWAY
+    with GATEWAY_LOCK:
+        if GATEWAY is None:
+            workers = int(os.getenv("LLM_GATEWAY_WORKERS", "8"))
+            backend = get_backend(max_connections=workers)
+            if backend is None:
+                return None
+            GATEWAY = LLMGateway(
+                backend,
+                requests_per_minute=float(os.getenv("LLM_RATE_PER_MINUTE", "30")),
+                burst=int(os.getenv("LLM_BURST", "5")),
+                workers=workers,
+            )
+    return GATEWAY
+
+
+def gateway_backend(user_id):
+    """Backend for one user's session, routed through the shared gateway (None in mock mode)."""
+    gateway = get_gateway()
+    return GatewayBackend(gateway, user_id) if gateway else None
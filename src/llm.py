@@ -1,17 +1,57 @@
-import os
 import json
-from groq import Groq
+
+from src.backends import get_backend
+from src.clause_classifier import CLAUSE_TYPES
+from src.response_parser import IncrementalJSONParser, parse_response, validate
+from src.translation import Translator
+
+SYSTEM_PROMPT = "You are a helpful and precise legal assistant. Always output JSON."
+# For this hackathon/demo, only the first few significant clauses are analyzed to be fast
+MAX_ANALYZED_CLAUSES = 5
+
+def batch_key(position):
+    """Id of a clause in batch prompts. Clause ids can repeat within a contract; positions can't."""
+    return f"#{position}"
+
+def estimate_tokens(text):
+    """Rough LLM token count (about 4 characters per token for English)."""
+    return max(1, len(text) // 4)
 
 class LLMService:
-    def __init__(self):
-        self.groq_api_key = os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=self.groq_api_key) if self.groq_api_key else None
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: an LLMBackend from src.backends. Defaults to the one
+                selected by LLM_BACKEND; None means mock mode.
+        """
+        self.backend = backend if backend is not None else get_backend()
+        # calls: completions issued, repaired: malformed responses or streamed
+        # clause items salvaged locally (each one a full retry avoided), field_retries: follow-up
+        # requests for missing fields only, failed: unparseable responses,
+        # skipped: boilerplate clauses not sent to the LLM at all,
+        # prompt_tokens: estimated tokens of the JSON-mode prompts sent
+        self.stats = {"calls": 0, "repaired": 0, "field_retries": 0, "failed": 0, "skipped": 0,
+                      "prompt_tokens": 0}
 
-    def analyze_clause(self, clause_text, context="General"):
+    def analyze_clause(self, clause_text, context="General", clause_type=None):
         """
-        Analyzes a specific clause for risks and plain language explanation using Groq.
+        Analyzes a specific clause for risks and plain language explanation using the LLM.
+        With a clause_type from the clause classifier a shorter type-specific prompt is used.
         """
-        prompt = f"""
+        return self._call_llm(self.clause_prompt(clause_text, context, clause_type), schema="clause_analysis")
+
+    def clause_prompt(self, clause_text, context="General", clause_type=None):
+        """The analyze_clause prompt: generic, or type-specific for a known clause type."""
+        info = CLAUSE_TYPES.get(clause_type)
+        if info and info.get("focus"):
+            return f"""
+        You are a legal expert in Indian Contract Law. Analyze this {info["label"]} clause, focusing on {info["focus"]}:
+
+        "{clause_text}"
+
+        JSON keys: "explanation" (max 2 sentences), "risk_score" (integer 1-10), "risk_reason" (if risk > 3), "favorable" ("Buyer", "Seller", "Mutual" or "Unknown"), "suggestion" (if risk > 5).
+        """
+        return f"""
         You are a legal expert specializing in Indian Contract Law. Analyze the following contract clause:
         
         "{clause_text}"
@@ -25,11 +65,35 @@ class LLMService:
         - "favorable": "Buyer", "Seller", "Mutual", or "Unknown".
         - "suggestion": Suggestion for improvement if risk > 5.
         """
-        return self._call_llm(prompt)
+
+    def routing_report(self, clauses, classifications):
+        """
+        Estimated tokens of the batch prompt stream_analyze_clauses sends for
+        these clauses with routing by clause type, versus the generic prompt
+        for the same clauses, so saved_tokens is only what the shorter prompt
+        saves. Without routing other clauses would be analyzed:
+        generic_clauses of them, generic_boilerplate of which are boilerplate.
+        Both exclude clause index reuse, which cuts either prompt the same way.
+        """
+        generic, _, _ = self._select_clauses(clauses)
+        routed, _, types = self._select_clauses(clauses, classifications)
+        generic_tokens = self.prompt_tokens(self.batch_prompt(clauses, routed))
+        routed_tokens = self.prompt_tokens(self.batch_prompt(clauses, routed, types=types))
+        return {
+            "clauses": len(clauses),
+            "skipped": sum(1 for k in classifications if k["skip"]),
+            "generic_clauses": len(generic),
+            "generic_boilerplate": sum(1 for k in classifications[:len(generic)] if k["skip"]),
+            "routed_clauses": len(routed),
+            "generic_tokens": generic_tokens,
+            "routed_tokens": routed_tokens,
+            "saved_tokens": generic_tokens - routed_tokens,
+            "saved_ratio": (generic_tokens - routed_tokens) / generic_tokens,
+        }
 
     def summarize_contract(self, full_text):
         """
-        Summarizes the entire contract using Groq.
+        Summarizes the entire contract using the LLM.
         """
         prompt = f"""
         You are a legal expert specializing in Indian Contract Law. Summarize the following contract text (truncated if necessary):
@@ -49,13 +113,13 @@ class LLMService:
             "has_auto_renewal": boolean
         }}
         """
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, schema="summary")
 
     def chat_about_contract(self, contract_text, user_question):
         """
         Answers a user question based on the contract text.
         """
-        if not self.client:
+        if not self.backend:
             return "Local Mode: API Key missing. Unable to answer."
             
         prompt = f"""
@@ -69,33 +133,50 @@ class LLMService:
         """
         
         try:
-            completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="openai/gpt-oss-120b"
-            )
-            return completion.choices[0].message.content
+            self.stats["calls"] += 1
+            return self.backend.complete([{"role": "user", "content": prompt}])
         except Exception as e:
             return f"Error: {str(e)}"
 
     def translate_text(self, text, target_lang="English"):
-        """Translates text using Groq."""
-        if not self.client: return f"[Mock Translation to {target_lang}]: {text[:100]}..."
+        """Translates text using the LLM, sentence by sentence through the translation memory."""
+        return Translator(self).translate_texts([text], target_lang)[0]
+
+    def translate_batch(self, segments, target_lang):
+        """
+        Translates a batch of segments in one request.
+        Returns (translations, error): translations is aligned with segments,
+        with None for entries that couldn't be translated, and error says why
+        the whole batch failed (None otherwise).
+        """
+        if not self.backend:
+            return [f"[Mock Translation to {target_lang}]: {segment}" for segment in segments], None
+
+        prompt = f"""
+        Translate each of the following legal text segments to {target_lang}. Maintain legal accuracy.
         
-        prompt = f"Translate the following legal text to {target_lang}. Maintain legal accuracy:\n\n{text[:2000]}"
-        try:
-            completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="openai/gpt-oss-120b"
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"Error: {str(e)}"
+        SEGMENTS: {json.dumps(segments, ensure_ascii=False)}
+        
+        Provide valid JSON output with one key:
+        - "translations": List of {len(segments)} translated strings, in the same order as the segments.
+        """
+        result = self._call_llm(prompt, schema="translation")
+        if "error" in result:
+            return [None] * len(segments), result["error"]
+        translations = result.get("translations", [])
+        if len(translations) != len(segments):
+            # Misaligned output can't be matched back to segments safely
+            return [None] * len(segments), (f"Expected {len(segments)} translations, "
+                                            f"got {len(translations)}")
+        return [t if isinstance(t, str) and t.strip() else None for t in translations], None
 
-    def _call_llm(self, prompt):
+    def _call_llm(self, prompt, schema=None):
         """
-        Internal dispatcher to call Groq.
+        Internal dispatcher to call the LLM backend.
+        If a schema name is given the response is validated against it and
+        only the missing fields are re-requested.
         """
-        if not self.client:
+        if not self.backend:
             return {
                 "explanation": "Mock explanation: Groq API key not found.",
                 "risk_score": 5,
@@ -106,64 +187,259 @@ class LLMService:
             }
         
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a helpful and precise legal assistant. Always output JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="openai/gpt-oss-120b",
-                response_format={"type": "json_object"}
-            )
-            return self._clean_json(chat_completion.choices[0].message.content)
+            content = self._complete(prompt)
         except Exception as e:
             return {"error": str(e)}
 
-    def _clean_json(self, text):
-        """Helper to extract JSON from text if code blocks are used."""
+        result = self._clean_json(content)
+        if schema and "error" not in result:
+            result, missing = validate(result, schema)
+            if missing:
+                result.update(self._request_missing_fields(prompt, missing, schema))
+        return result
+
+    def _complete(self, prompt, stream=False):
+        """Sends a JSON-mode request to the backend. Returns the text, or a chunk iterator if streaming."""
+        self.stats["calls"] += 1
+        self.stats["prompt_tokens"] += self.prompt_tokens(prompt)
+        return self.backend.complete(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            json_mode=True,
+            stream=stream
+        )
+
+    def prompt_tokens(self, prompt):
+        """Estimated tokens of a JSON-mode request for prompt, system message included."""
+        return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+
+    def _request_missing_fields(self, prompt, missing, schema):
+        """
+        Re-requests only the fields that were missing or invalid in a response.
+        Returns a dict with whichever of those fields could be recovered.
+        """
+        self.stats["field_retries"] += 1
+        follow_up = f"""{prompt}
+
+        Your previous answer was missing or had invalid values for: {", ".join(missing)}.
+        Return valid JSON containing ONLY these keys: {", ".join(missing)}.
+        """
         try:
-            return json.loads(text)
-        except:
-            # simple attempt to find { ... }
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start != -1 and end != -1:
-                try:
-                    return json.loads(text[start:end])
-                except:
-                    pass
-            return {"error": f"Failed to parse JSON response. Raw output: {text[:200]}..."}
-
-    def batch_analyze_clauses(self, clauses):
+            data = self._clean_json(self._complete(follow_up))
+        except Exception:
+            return {}
+        cleaned, still_missing = validate(data, schema)
+        return {k: cleaned[k] for k in missing if k not in still_missing}
+
+    def _clean_json(self, text):
+        """Helper to extract JSON from text, repairing fences, trailing commas and truncation."""
+        data, repaired = parse_response(text)
+        if isinstance(data, dict):
+            if repaired:
+                self.stats["repaired"] += 1
+            return data
+        self.stats["failed"] += 1
+        return {"error": f"Failed to parse JSON response. Raw output: {(text or '')[:200]}..."}
+
+    def batch_analyze_clauses(self, clauses, index=None, contract=None, classifications=None):
         """
         Analyzes a list of clauses in batch (or a subset to save tokens).
+        Results are returned in document order.
         """
-        if not self.client:
-            return [{"id": c["id"], "explanation": "Mock analysis.", "risk_score": 1} for c in clauses]
+        results = list(self.stream_analyze_clauses(clauses, index=index, contract=contract,
+                                                   classifications=classifications))
+        results.sort(key=lambda r: r.get("position", len(clauses)))
+        return results
 
-        # For this hackathon/demo, let's analyze the first 5 significant clauses to be fast
-        target_clauses = clauses[:5] 
-        
-        results = []
-        for clause in target_clauses:
-            # We treat each clause individually or could batch them. 
-            # Individual calls are easier to manage for structured output per clause.
-            analysis = self.analyze_clause(clause["text"], context=f"Clause {clause['id']}")
-            
-            # Merge the analysis with the original ID
+    def stream_analyze_clauses(self, clauses, index=None, contract=None, classifications=None):
+        """
+        Analyzes clauses in a single streamed request, yielding each clause's
+        analysis as soon as its JSON object is complete.
+        Clauses the model skipped are analyzed individually at the end.
+        If a ClauseIndex is given, clauses whose exact (normalized) wording was
+        analyzed before are reused without an LLM call, similar ones are passed
+        to the model only as a reference, and new analyses are added to the index.
+        classifications (from ClauseClassifier.classify, one per clause) route
+        each clause to a type-specific prompt; boilerplate clauses are
+        returned as skipped without being sent and don't count towards the
+        clauses analyzed.
+        Results arrive in completion order, not document order; each carries
+        "position", the clause's index in clauses, since clause ids can repeat
+        (e.g. "1." in two schedules).
+        """
+        if not self.backend:
+            for position, c in enumerate(clauses):
+                yield {"id": c["id"], "position": position, "explanation": "Mock analysis.", "risk_score": 1}
+            return
+
+        targets, skipped, types = self._select_clauses(clauses, classifications)
+        for position, kind in skipped:
+            self.stats["skipped"] += 1
+            yield self._place({"explanation": f"Standard {kind['label'].lower()} clause; not analyzed."},
+                              clauses, position, {position: kind["type"]})
+
+        # Streamed items are matched back by batch key ("#<position>"), not clause id
+        pending = {}
+        references = {}
+        for position in targets:
+            clause = clauses[position]
+            match = index.find_analysis(clause["text"]) if index is not None else None
+            if match and match[3]:
+                yield self._place(dict(match[0], reused_from=match[2]), clauses, position, types)
+                continue
+            if match:
+                references[position] = match[0]
+            pending[batch_key(position)] = position
+        if not pending:
+            return
+
+        prompt = self.batch_prompt(clauses, list(pending.values()), references, types if classifications else None)
+
+        parser = IncrementalJSONParser()
+        try:
+            for chunk in self._complete(prompt, stream=True):
+                for item in parser.feed(chunk):
+                    position = pending.pop(str(item.get("id")), None)
+                    if position is not None:
+                        yield self._streamed(item, clauses, position, types, index, contract)
+        except Exception:
+            # Fall through: whatever wasn't streamed is analyzed one by one
+            pass
+
+        # A truncated stream leaves the last clause half-written; keep what arrived
+        for item in parser.close():
+            position = pending.pop(str(item.get("id")), None)
+            if position is not None:
+                yield self._streamed(item, clauses, position, types, index, contract)
+        self.stats["repaired"] += parser.repaired
+
+        for position in list(pending.values()):
+            clause = clauses[position]
+            analysis = self.analyze_clause(clause["text"], context=f"Clause {clause['id']}",
+                                           clause_type=types.get(position))
             if isinstance(analysis, dict):
-                analysis["id"] = clause["id"]
-                analysis["original_text"] = clause["text"]
-                results.append(analysis)
+                yield self._remember(index, contract, self._place(analysis, clauses, position, types))
             else:
-                results.append({"id": clause["id"], "error": str(analysis)})
-                
-        return results
+                yield self._place({"error": str(analysis)}, clauses, position, {})
+
+    def _select_clauses(self, clauses, classifications=None):
+        """
+        Picks the clauses to analyze: the first MAX_ANALYZED_CLAUSES, not
+        counting boilerplate that classifications mark as skipped.
+        Returns (targets, skipped, types) by position in clauses: targets lists
+        positions, skipped holds (position, classification) pairs passed over on
+        the way, types maps position -> clause type.
+        """
+        targets, skipped, types = [], [], {}
+        for position in range(len(clauses)):
+            if len(targets) == MAX_ANALYZED_CLAUSES:
+                break
+            kind = classifications[position] if classifications else None
+            if kind and kind["skip"]:
+                skipped.append((position, kind))
+                continue
+            if kind:
+                types[position] = kind["type"]
+            targets.append(position)
+        return targets, skipped, types
+
+    def batch_prompt(self, clauses, positions, references=None, types=None):
+        """
+        The streamed batch analysis prompt for clauses[p] for p in positions.
+        Clauses are identified by batch_key(p). Without types every clause gets
+        the generic instructions; with types (position -> clause type) clauses
+        are grouped by type under one line stating the type's focus, and the
+        frame is one instruction line and one schema line. references maps
+        position -> a similar earlier analysis.
+        """
+        references = references or {}
+        if types is None:
+            clause_block = "\n\n".join(self._clause_entry(p, clauses[p], references.get(p)) for p in positions)
+            return f"""
+        You are a legal expert specializing in Indian Contract Law. Analyze each of the following contract clauses:
+        
+        {clause_block}
+        
+        Provide the output in valid JSON format as {{"clauses": [...]}} with one object per clause, in the order given, with keys:
+        - "id": The clause id exactly as given (e.g. "#0").
+        - "explanation": Simple plain English explanation (max 2 sentences).
+        - "risk_score": Integer 1-10 (10 being highest risk).
+        - "risk_reason": Why is this risky? (If risk > 3).
+        - "favorable": "Buyer", "Seller", "Mutual", or "Unknown".
+        - "suggestion": Suggestion for improvement if risk > 5.
+        """
+
+        groups = {}
+        for position in positions:
+            groups.setdefault(types.get(position), []).append(position)
+        lines = ["Indian contract law. Rate each quoted clause; a heading line says what to check in the clauses under it."]
+        for clause_type, members in groups.items():
+            info = CLAUSE_TYPES.get(clause_type)
+            if info and info.get("focus"):
+                lines.append(f'{info["label"]}: {info["focus"]}')
+            lines.extend(self._clause_entry(p, clauses[p], references.get(p), compact=True) for p in members)
+        lines.append('JSON {"clauses": [{"id", "explanation" (max 2 sentences), "risk_score" (1-10), '
+                     '"risk_reason" (if risk > 3), "favorable" (Buyer/Seller/Mutual/Unknown), '
+                     '"suggestion" (if risk > 5)}]}, one object per clause.')
+        return "\n".join(lines)
+
+    def _clause_entry(self, position, clause, reference=None, compact=False):
+        """
+        Formats one clause for the batch prompt, with a similar earlier analysis
+        if there is one. Compact entries are just the key and the quoted text.
+        """
+        if compact:
+            entry = f'{batch_key(position)} "{clause["text"]}"'
+        else:
+            entry = f'Clause {batch_key(position)}:\n"{clause["text"]}"'
+        if reference:
+            entry += (f'\n(A similar clause was previously rated risk {reference.get("risk_score", "?")}/10: '
+                      f'"{reference.get("explanation", "")}" The wording differs, so rate this clause on its own text.)')
+        return entry
+
+    def _place(self, analysis, clauses, position, types):
+        """Tags an analysis with its clause's id, text and position, and its type if classified."""
+        clause = clauses[position]
+        analysis["id"] = clause["id"]
+        analysis["original_text"] = clause["text"]
+        analysis["position"] = position
+        if position in types:
+            analysis["clause_type"] = types[position]
+        return analysis
+
+    def _streamed(self, item, clauses, position, types, index, contract):
+        """Finishes one streamed clause result and adds it to the clause index."""
+        analysis = self._finish_clause(item, clauses[position])
+        return self._remember(index, contract, self._place(analysis, clauses, position, types))
+
+    def _remember(self, index, contract, analysis):
+        """Adds a successful clause analysis to the clause index, if one is in use."""
+        if index is not None and "error" not in analysis:
+            stored = {k: v for k, v in analysis.items() if k not in ("id", "original_text", "position", "clause_type")}
+            index.add(analysis["original_text"], stored, contract=contract, clause_id=analysis["id"])
+        return analysis
+
+    def _finish_clause(self, item, clause):
+        """Validates one streamed clause result, re-requesting only its missing fields."""
+        analysis, missing = validate(item, "clause_analysis")
+        if missing:
+            prompt = f"""
+        You are a legal expert specializing in Indian Contract Law. Analyze the following contract clause:
+        
+        "{clause["text"]}"
+        
+        Keys: "explanation" (max 2 sentences), "risk_score" (integer 1-10), "risk_reason", "favorable" ("Buyer", "Seller", "Mutual" or "Unknown"), "suggestion".
+        """
+            analysis.update(self._request_missing_fields(prompt, missing, "clause_analysis"))
+        return analysis
 
     def compare_clause_with_standard(self, actual_clause, standard_clause):
         """
         Compares an actual clause against a standard version.
         """
-        if not self.client:
+        if not self.backend:
             return {
                 "similarity_score": 75,
                 "deviations": "Mock: The actual clause is stricter than standard.",
@@ -184,4 +460,4 @@ class LLMService:
         - "deviations": Explain key differences (e.g., "Actual clause imposes one-way indemnity instead of mutual").
         - "verdict": "Fair", "Strict", or "Unfavorable".
         """
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, schema="comparison")
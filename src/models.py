@@ -0,0 +1,255 @@
+"""
+Compact in-memory representation of an analysis result.
+Clause text is stored as offsets into the single contract text buffer instead
+of a copy per clause, repeated labels are interned, and the whole result can be
+serialized to a small binary blob. get()/[] mirror the old dict interface so
+the UI and PDF export work unchanged.
+"""
+import json
+import struct
+import sys
+import zlib
+
+MAGIC = b"CAR2"
+NONE_INDEX = 0xFFFFFFFF
+# id, start, end, risk_score, explanation, risk_reason, favorable, suggestion, error, clause_type
+CLAUSE_RECORD = struct.Struct("<IIIh6I")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ClauseResult:
+    """Analysis of one clause. original_text is sliced from the shared contract text."""
+
+    __slots__ = ("id", "start", "end", "explanation", "risk_score", "risk_reason",
+                 "favorable", "suggestion", "error", "clause_type", "buffer")
+
+    FIELDS = ("explanation", "risk_score", "risk_reason", "favorable", "suggestion", "error", "clause_type")
+
+    def __init__(self, buffer, clause_id, start, end, explanation=None, risk_score=None,
+                 risk_reason=None, favorable=None, suggestion=None, error=None, clause_type=None):
+        self.buffer = buffer
+        self.id = _intern(clause_id)
+        self.start = start
+        self.end = end
+        self.explanation = explanation
+        self.risk_score = risk_score
+        self.risk_reason = risk_reason
+        self.favorable = _intern(favorable)
+        self.suggestion = suggestion
+        self.error = error
+        self.clause_type = _intern(clause_type)
+
+    @property
+    def original_text(self):
+        return self.buffer[self.start:self.end]
+
+    def get(self, key, default=None):
+        if key == "original_text":
+            return self.original_text
+        value = getattr(self, key) if key == "id" or key in self.FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def to_dict(self):
+        data = {"id": self.id, "original_text": self.original_text}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+
+class AnalysisResult:
+    """Everything the Analysis page keeps in session state for one contract."""
+
+    __slots__ = ("text", "entities", "summary", "clauses", "composite_risk", "risk_level")
+
+    KEYS = ("text", "entities", "summary", "clauses", "composite_risk", "risk_level")
+
+    def __init__(self, text, entities, summary, clauses, composite_risk, risk_level):
+        self.text = text
+        self.entities = entities
+        self.summary = summary
+        self.clauses = clauses
+        self.composite_risk = composite_risk
+        self.risk_level = _intern(risk_level)
+
+    @classmethod
+    def build(cls, text, entities, summary, clause_analysis, clauses, composite_risk, risk_level):
+        """
+        Builds a compact result from the pipeline's dict outputs.
+        Args:
+            clause_analysis: list of dicts from LLMService.stream_analyze_clauses
+                or batch_analyze_clauses, in any order. Analyses that carry a
+                "position" are put back in document order.
+            clauses: output of split_into_clauses(text), used for the offsets.
+        """
+        offsets = {}
+        for clause in clauses:
+            offsets.setdefault(clause["id"], []).append((clause["start"], clause["end"]))
+
+        results = []
+        for analysis in sorted(clause_analysis, key=lambda a: a.get("position", len(clauses))):
+            position = analysis.get("position")
+            spans = offsets.get(analysis.get("id"))
+            if position is not None and position < len(clauses):
+                start, end = clauses[position]["start"], clauses[position]["end"]
+            elif spans:
+                start, end = spans.pop(0)
+            else:
+                original = analysis.get("original_text", "")
+                start = text.find(original) if original else -1
+                end = start + len(original) if start != -1 else 0
+                start = max(start, 0)
+            score = analysis.get("risk_score")
+            results.append(ClauseResult(
+                text, analysis.get("id", "?"), start, end,
+                explanation=analysis.get("explanation"),
+                risk_score=score if isinstance(score, int) else None,
+                risk_reason=analysis.get("risk_reason"),
+                favorable=analysis.get("favorable"),
+                suggestion=analysis.get("suggestion"),
+                error=analysis.get("error"),
+                clause_type=analysis.get("clause_type"),
+            ))
+
+        compact_entities = {_intern(label): tuple(values) for label, values in entities.items()}
+        compact_summary = {_intern(k): _intern(v) if k in ("contract_type", "overall_risk") else v
+                           for k, v in summary.items()}
+        for key in ("key_dates", "key_obligations"):
+            if isinstance(compact_summary.get(key), list):
+                compact_summary[key] = tuple(compact_summary[key])
+
+        return cls(text, compact_entities, compact_summary, tuple(results), composite_risk, risk_level)
+
+    def get(self, key, default=None):
+        if key not in self.KEYS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def to_dict(self):
+        """The original dict layout, e.g. for JSON export."""
+        return {
+            "text": self.text,
+            "entities": {label: list(values) for label, values in self.entities.items()},
+            "summary": {k: list(v) if isinstance(v, tuple) else v for k, v in self.summary.items()},
+            "clauses": [c.to_dict() for c in self.clauses],
+            "composite_risk": self.composite_risk,
+            "risk_level": self.risk_level,
+        }
+
+    def to_bytes(self):
+        """
+        Serializes to a compact binary blob: a string table plus fixed-width
+        clause records, zlib-compressed. Clause text is not stored twice.
+        """
+        strings = []
+        index = {}
+
+        def ref(value):
+            if value is None:
+                return NONE_INDEX
+            value = str(value)
+            if value not in index:
+                index[value] = len(strings)
+                strings.append(value)
+            return index[value]
+
+        body = bytearray()
+        body += struct.pack("<hI", self.composite_risk if self.composite_risk is not None else -1, ref(self.risk_level))
+
+        body += struct.pack("<I", len(self.entities))
+        for label, values in self.entities.items():
+            body += struct.pack("<II", ref(label), len(values))
+            body += struct.pack(f"<{len(values)}I", *[ref(v) for v in values])
+
+        body += struct.pack("<I", len(self.clauses))
+        for c in self.clauses:
+            score = c.risk_score if c.risk_score is not None else -1
+            body += CLAUSE_RECORD.pack(ref(c.id), c.start, c.end, score,
+                                       ref(c.explanation), ref(c.risk_reason), ref(c.favorable),
+                                       ref(c.suggestion), ref(c.error), ref(c.clause_type))
+
+        text = self.text.encode("utf-8")
+        summary = json.dumps(self.summary, separators=(",", ":")).encode("utf-8")
+        table = bytearray()
+        for value in strings:
+            encoded = value.encode("utf-8")
+            table += struct.pack("<I", len(encoded)) + encoded
+        payload = struct.pack("<III", len(text), len(summary), len(table)) + text + summary + table + body
+        return MAGIC + zlib.compress(bytes(payload), 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of to_bytes()."""
+        if data[:4] != MAGIC:
+            raise ValueError("Not a serialized analysis result.")
+        payload = zlib.decompress(data[4:])
+
+        text_len, summary_len, table_len = struct.unpack_from("<III", payload, 0)
+        pos = 12
+        text = payload[pos:pos + text_len].decode("utf-8")
+        pos += text_len
+        summary = json.loads(payload[pos:pos + summary_len].decode("utf-8"))
+        pos += summary_len
+        strings = []
+        end = pos + table_len
+        while pos < end:
+            (length,) = struct.unpack_from("<I", payload, pos)
+            strings.append(sys.intern(payload[pos + 4:pos + 4 + length].decode("utf-8")))
+            pos += 4 + length
+
+        def deref(i):
+            return None if i == NONE_INDEX else strings[i]
+
+        composite_risk, level_ref = struct.unpack_from("<hI", payload, pos)
+        pos += 6
+
+        entities = {}
+        (num_labels,) = struct.unpack_from("<I", payload, pos)
+        pos += 4
+        for _ in range(num_labels):
+            label_ref, count = struct.unpack_from("<II", payload, pos)
+            pos += 8
+            refs = struct.unpack_from(f"<{count}I", payload, pos)
+            pos += 4 * count
+            entities[deref(label_ref)] = tuple(deref(r) for r in refs)
+
+        clauses = []
+        (num_clauses,) = struct.unpack_from("<I", payload, pos)
+        pos += 4
+        for _ in range(num_clauses):
+            id_ref, start, end, score, expl, reason, fav, sugg, err, kind = CLAUSE_RECORD.unpack_from(payload, pos)
+            pos += CLAUSE_RECORD.size
+            clauses.append(ClauseResult(text, deref(id_ref), start, end,
+                                        explanation=deref(expl),
+                                        risk_score=None if score == -1 else score,
+                                        risk_reason=deref(reason), favorable=deref(fav),
+                                        suggestion=deref(sugg), error=deref(err),
+                                        clause_type=deref(kind)))
+
+        for key in ("key_dates", "key_obligations"):
+            if isinstance(summary.get(key), list):
+                summary[key] = tuple(summary[key])
+        return cls(text, entities, summary, tuple(clauses),
+                   None if composite_risk == -1 else composite_risk, deref(level_ref))
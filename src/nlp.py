@@ -4,6 +4,15 @@ import re
 # Global variable to cache the model
 NLP_MODEL = None
 
+# Spacy entity label -> category shown in the UI
+ENTITY_CATEGORIES = {
+    "ORG": "Parties",
+    "PERSON": "Parties",
+    "DATE": "Dates",
+    "MONEY": "Money",
+    "GPE": "Locations"
+}
+
 def load_nlp_model():
     """Loads the Spacy NLP model."""
     global NLP_MODEL
@@ -32,20 +41,14 @@ def extract_entities(text):
         "Money": [],
         "Locations": []
     }
+    # Sets alongside the lists keep dedupe O(1) while preserving first-seen order
+    seen = {category: set() for category in entities}
     
     for ent in doc.ents:
-        if ent.label_ == "ORG" or ent.label_ == "PERSON":
-            if ent.text not in entities["Parties"]:
-                entities["Parties"].append(ent.text)
-        elif ent.label_ == "DATE":
-            if ent.text not in entities["Dates"]:
-                entities["Dates"].append(ent.text)
-        elif ent.label_ == "MONEY":
-            if ent.text not in entities["Money"]:
-                entities["Money"].append(ent.text)
-        elif ent.label_ == "GPE":
-            if ent.text not in entities["Locations"]:
-                entities["Locations"].append(ent.text)
+        category = ENTITY_CATEGORIES.get(ent.label_)
+        if category and ent.text not in seen[category]:
+            seen[category].add(ent.text)
+            entities[category].append(ent.text)
                 
     return entities
 
@@ -61,27 +64,38 @@ def highlight_entities(text):
 def split_into_clauses(text):
     """
     Splits text into clauses based on common numbering patterns.
-    Returns a list of dicts: {'id': '1', 'text': '...'}
+    Returns a list of dicts: {'id': '1', 'text': '...', 'start': 0, 'end': 3}
+    where start/end are the offsets of the clause text within the input.
     """
     # Pattern for "1. ", "1.1 ", "ARTICLE 1", "Section 1"
     # This is a simple heuristic; legal docs vary wildly.
     pattern = r'(?:\n|^)\s*(?:ARTICLE\s+[IVX]+|SECTION\s+\d+|[0-9]+\.)\s+'
     
-    splits = re.split(pattern, text, flags=re.IGNORECASE)
-    matches = re.findall(pattern, text, flags=re.IGNORECASE)
+    matches = list(re.finditer(pattern, text, flags=re.IGNORECASE))
     
     clauses = []
     
-    # re.split includes the part before the first match (often preamble/title)
-    if splits[0].strip():
-        clauses.append({"id": "Preamble", "text": splits[0].strip()})
+    # The part before the first match is often the preamble/title
+    preamble_end = matches[0].start() if matches else len(text)
+    preamble = _stripped_span(text, 0, preamble_end)
+    if preamble:
+        clauses.append({"id": "Preamble", "text": text[preamble[0]:preamble[1]], "start": preamble[0], "end": preamble[1]})
         
     for i, match in enumerate(matches):
-        if i + 1 < len(splits):
-            clause_text = splits[i+1].strip()
-            if clause_text:
-                # Clean up the ID from the match (remove newlines/spaces)
-                clause_id = match.strip()
-                clauses.append({"id": clause_id, "text": clause_text})
+        segment_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        span = _stripped_span(text, match.end(), segment_end)
+        if span:
+            # Clean up the ID from the match (remove newlines/spaces)
+            clause_id = match.group().strip()
+            clauses.append({"id": clause_id, "text": text[span[0]:span[1]], "start": span[0], "end": span[1]})
                 
     return clauses
+
+def _stripped_span(text, start, end):
+    """Returns (start, end) of text[start:end] with whitespace stripped, or None if blank."""
+    segment = text[start:end]
+    stripped = segment.strip()
+    if not stripped:
+        return None
+    offset = start + (len(segment) - len(segment.lstrip()))
+    return offset, offset + len(stripped)
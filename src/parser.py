@@ -1,52 +1,420 @@
+import contextlib
+import functools
 import io
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
 import pdfplumber
-import docx
 
-def extract_text_from_pdf(file_bytes):
-    """Extracts text from a PDF file."""
+# WordprocessingML namespace, as it appears in ElementTree tags
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+T, TAB, BR, CR = W + "t", W + "tab", W + "br", W + "cr"
+HEADER_FOOTER_PATTERN = re.compile(r"word/(header|footer)\d*\.xml$")
+
+# Upload limits; overridable with MAX_UPLOAD_MB, MAX_PDF_PAGES and UPLOAD_SPOOL_MB
+DEFAULT_MAX_UPLOAD_MB = 200
+DEFAULT_MAX_PDF_PAGES = 2000
+DEFAULT_SPOOL_MB = 16
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadLimitError(ValueError):
+    """Raised when an upload is over the configured size or page limit."""
+
+
+def _megabytes(name, default):
+    return int(float(os.getenv(name, default)) * 1024 * 1024)
+
+
+def _known_size(upload):
+    """Size of an upload without reading it, or None if it can't be known up front."""
+    if isinstance(upload, io.BytesIO):
+        size = getattr(upload, "size", None)
+        if isinstance(size, int):
+            return size
+        with upload.getbuffer() as view:
+            return view.nbytes
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+        return len(upload)
+    if isinstance(upload, (str, os.PathLike)):
+        return os.path.getsize(upload)
+    size = getattr(upload, "size", None)
+    return size if isinstance(size, int) else None
+
+
+def _check_size(size, max_bytes):
+    if max_bytes and size > max_bytes:
+        raise UploadLimitError(
+            f"The file is {size / 1024 / 1024:.1f} MB; uploads are limited to {max_bytes / 1024 / 1024:g} MB.")
+
+
+@contextlib.contextmanager
+def open_upload(upload, max_bytes=None, spool_bytes=None, stats=None):
+    """
+    Yields a seekable binary file for an upload without copying it where possible.
+    In-memory uploads (Streamlit's UploadedFile is a BytesIO) and bytes are
+    read in place and paths are opened directly. Any other stream is copied in
+    chunks into a SpooledTemporaryFile, which stays in memory up to spool_bytes
+    and moves to a temp file on disk beyond that.
+    The size limit is checked before reading when the size is known, and
+    while copying otherwise, so an oversized upload is never read in full.
+    """
+    if max_bytes is None:
+        max_bytes = _megabytes("MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB)
+    stats = stats if stats is not None else {}
+
+    size = _known_size(upload)
+    if size is not None:
+        _check_size(size, max_bytes)
+        stats["bytes"] = size
+
+    if isinstance(upload, io.BytesIO):
+        stats["source"] = "memory"
+        upload.seek(0)
+        yield upload
+        return
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+        stats["source"] = "memory"
+        yield io.BytesIO(upload)
+        return
+    if isinstance(upload, (str, os.PathLike)):
+        stats["source"] = "file"
+        with open(upload, "rb") as f:
+            yield f
+        return
+
+    if spool_bytes is None:
+        spool_bytes = _megabytes("UPLOAD_SPOOL_MB", DEFAULT_SPOOL_MB)
+    with tempfile.SpooledTemporaryFile(max_size=spool_bytes) as spool:
+        copied = 0
+        while True:
+            chunk = upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            copied += len(chunk)
+            _check_size(copied, max_bytes)
+            spool.write(chunk)
+        spool.seek(0)
+        stats["bytes"] = copied
+        stats["source"] = "disk" if copied > spool_bytes else "spooled"
+        yield spool
+
+def extract_text_from_pdf(file, max_pages=None, stats=None):
+    """Extracts text from a PDF file (bytes or a binary file)."""
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
     text = ""
     try:
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        with pdfplumber.open(file) as pdf:
             if not pdf.pages:
                 return "Error: The PDF file seems empty or has no pages."
+            if stats is not None:
+                stats["pages"] = len(pdf.pages)
+            if max_pages and len(pdf.pages) > max_pages:
+                raise UploadLimitError(f"The PDF has {len(pdf.pages)} pages; uploads are limited to {max_pages} pages.")
             for page in pdf.pages:
                 extracted = page.extract_text()
                 if extracted:
                     text += extracted + "\n"
+                # Parsed layout objects are cached per page; drop them as we go
+                page.close()
         if not text.strip():
             return "Warning: No text could be extracted from this PDF. It might be an image-only scan."
+    except UploadLimitError:
+        raise
     except Exception as e:
         # Catch structurally invalid PDFs
         return f"Error: Unable to parse PDF. The file might be corrupted or not a valid PDF. Details: {str(e)}"
     return text
 
-def extract_text_from_docx(file_bytes):
-    """Extracts text from a DOCX file."""
-    doc = docx.Document(io.BytesIO(file_bytes))
-    text = ""
-    for para in doc.paragraphs:
-        text += para.text + "\n"
-    return text
+class _Numbering:
+    """
+    List numbering definitions of a DOCX package: (numId, ilvl) -> (numFmt, start)
+    from word/numbering.xml, and styleId -> (numId, ilvl) for paragraph styles
+    that carry their own numbering (e.g. "List Number"), following basedOn.
+    styles.xml can be large, so it is only read once a styled paragraph needs it.
+    """
+
+    def __init__(self, zf):
+        self.zf = zf
+        self.levels = {}
+        self.styles = None
+        if "word/numbering.xml" not in zf.namelist():
+            return
+        root = ET.fromstring(zf.read("word/numbering.xml"))
+        abstract = {}
+        for node in root.iter(W + "abstractNum"):
+            levels = {}
+            for lvl in node.iter(W + "lvl"):
+                fmt = lvl.find(W + "numFmt")
+                start = lvl.find(W + "start")
+                levels[lvl.get(W + "ilvl")] = (
+                    fmt.get(W + "val") if fmt is not None else "decimal",
+                    int(start.get(W + "val")) if start is not None else 1,
+                )
+            abstract[node.get(W + "abstractNumId")] = levels
+        for num in root.iter(W + "num"):
+            ref = num.find(W + "abstractNumId")
+            if ref is not None:
+                for ilvl, level in abstract.get(ref.get(W + "val"), {}).items():
+                    self.levels[(num.get(W + "numId"), ilvl)] = level
+
+    def style(self, style_id):
+        """(numId, ilvl) a paragraph style numbers its paragraphs with, or (None, None)."""
+        if not self.levels:
+            return None, None
+        if self.styles is None:
+            self.styles = self._read_styles()
+        return self.styles.get(style_id, (None, None))
+
+    def _read_styles(self):
+        if "word/styles.xml" not in self.zf.namelist():
+            return {}
+        styles = {}
+        based_on = {}
+        for style in ET.fromstring(self.zf.read("word/styles.xml")).iter(W + "style"):
+            style_id = style.get(W + "styleId")
+            parent = style.find(W + "basedOn")
+            if parent is not None:
+                based_on[style_id] = parent.get(W + "val")
+            num_pr = style.find(W + "pPr/" + W + "numPr")
+            if num_pr is not None:
+                styles[style_id] = _num_pr(num_pr)
+        for style_id in based_on:
+            parent, seen = style_id, set()
+            while parent not in styles and parent in based_on and parent not in seen:
+                seen.add(parent)
+                parent = based_on[parent]
+            if parent in styles:
+                styles[style_id] = styles[parent]
+        return styles
+
+
+def _num_pr(num_pr):
+    """(numId, ilvl) of a w:numPr element; either may be None."""
+    ilvl = num_pr.find(W + "ilvl")
+    num_id = num_pr.find(W + "numId")
+    return (num_id.get(W + "val") if num_id is not None else None,
+            ilvl.get(W + "val") if ilvl is not None else None)
 
-def extract_text_from_txt(file_bytes):
-    """Extracts text from a TXT file."""
-    return file_bytes.decode("utf-8")
 
-def parse_document(uploaded_file):
+def _paragraph_text(p):
+    parts = []
+    for node in p.iter():
+        tag = node.tag
+        if tag == T:
+            parts.append(node.text or "")
+        elif tag == TAB:
+            parts.append("\t")
+        elif tag == BR or tag == CR:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _roman(n):
+    """Lower-case roman numeral for n >= 1, as Word renders lowerRoman list levels."""
+    numerals = ((1000, "m"), (900, "cm"), (500, "d"), (400, "cd"), (100, "c"), (90, "xc"),
+                (50, "l"), (40, "xl"), (10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i"))
+    parts = []
+    for value, numeral in numerals:
+        count, n = divmod(n, value)
+        parts.append(numeral * count)
+    return "".join(parts)
+
+
+def _paragraph_kind(p, numbering, counters):
+    """
+    Returns (kind, prefix) for a body paragraph. Word auto-numbering isn't part
+    of the text, so top-level decimal list items get their "N. " number back;
+    this is what lets split_into_clauses find clauses in auto-numbered documents.
+    """
+    ppr = p.find(W + "pPr")
+    if ppr is None:
+        return "paragraph", ""
+    style = ppr.find(W + "pStyle")
+    style = style.get(W + "val", "") if style is not None else ""
+    kind = "heading" if style.startswith("Heading") or style == "Title" else "list"
+
+    num_id, ilvl = numbering.style(style) if style else (None, None)
+    num_pr = ppr.find(W + "numPr")
+    if num_pr is not None:
+        own_id, own_ilvl = _num_pr(num_pr)
+        num_id, ilvl = own_id or num_id, own_ilvl or ilvl
+    if num_id is None:
+        return ("heading" if kind == "heading" else "paragraph"), ""
+    ilvl = ilvl or "0"
+    fmt, start = numbering.levels.get((num_id, ilvl), ("decimal", 1))
+    if num_id == "0" or fmt in ("none", "bullet"):
+        return kind, "- " if fmt == "bullet" else ""
+
+    # Deeper levels restart whenever a shallower level advances
+    level = int(ilvl)
+    for key in [k for k in counters if k[0] == num_id and k[1] > level]:
+        del counters[key]
+    counters[(num_id, level)] = counters.get((num_id, level), start - 1) + 1
+    n = counters[(num_id, level)]
+    if level == 0 and fmt == "decimal":
+        return kind, f"{n}. "
+    if fmt == "lowerLetter":
+        return kind, f"({chr(ord('a') + (n - 1) % 26)}) "
+    if fmt == "lowerRoman":
+        return kind, f"({_roman(n)}) "
+    return kind, ""
+
+
+def _iter_part(stream, numbering, counters):
+    """Streams one WordprocessingML part, yielding (kind, text) blocks in order."""
+    P, TBL, TR, TC = W + "p", W + "tbl", W + "tr", W + "tc"
+    containers = (W + "body", W + "hdr", W + "ftr")
+    stack = []
+    table_depth = 0
+    row = None
+    cell = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == TBL:
+                table_depth += 1
+            elif table_depth == 1:
+                if elem.tag == TR:
+                    row = []
+                elif elem.tag == TC:
+                    cell = []
+            continue
+
+        stack.pop()
+        tag = elem.tag
+        if tag == P:
+            text = _paragraph_text(elem)
+            if table_depth:
+                if cell is not None and text.strip():
+                    cell.append(text.strip())
+            elif text.strip():
+                kind, prefix = _paragraph_kind(elem, numbering, counters)
+                yield kind, prefix + text.lstrip() if prefix else text
+            elem.clear()
+        elif tag == TBL:
+            table_depth -= 1
+        elif table_depth == 1:
+            if tag == TC:
+                row.append(" ".join(cell))
+                cell = None
+            elif tag == TR:
+                if any(row):
+                    yield "table_row", " | ".join(c for c in row if c)
+                row = None
+        else:
+            continue
+
+        # Drop finished top-level blocks so memory stays flat on large documents
+        if (tag == P or tag == TBL) and stack and stack[-1].tag in containers:
+            stack[-1].remove(elem)
+
+
+def iter_docx_blocks(file):
+    """
+    Streams a DOCX file (path, bytes or file-like) without building a document model.
+    Yields (kind, text) tuples in document order, where kind is one of
+    "header", "heading", "paragraph", "list", "table_row" or "footer".
+    Table rows are yielded as their cell texts joined with " | ".
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    with zipfile.ZipFile(file) as zf:
+        numbering = _Numbering(zf)
+        parts = sorted((m.group(1), name) for name in zf.namelist() for m in [HEADER_FOOTER_PATTERN.match(name)] if m)
+
+        seen = set()
+        for kind, name in parts:
+            if kind != "header":
+                continue
+            with zf.open(name) as stream:
+                for _, text in _iter_part(stream, numbering, {}):
+                    if text not in seen:
+                        seen.add(text)
+                        yield "header", text
+
+        with zf.open("word/document.xml") as stream:
+            yield from _iter_part(stream, numbering, {})
+
+        for kind, name in parts:
+            if kind != "footer":
+                continue
+            with zf.open(name) as stream:
+                for _, text in _iter_part(stream, numbering, {}):
+                    if text not in seen:
+                        seen.add(text)
+                        yield "footer", text
+
+
+def extract_text_from_docx(file):
+    """Extracts text from a DOCX file (bytes or a binary file), including tables, headers and footers."""
+    lines = []
+    for kind, text in iter_docx_blocks(file):
+        # A blank line before headings keeps sections apart for clause splitting
+        if kind == "heading" and lines:
+            lines.append("")
+        lines.append(text)
+    return "\n".join(lines) + "\n"
+
+def extract_text_from_txt(file):
+    """Extracts text from a TXT file (bytes or a binary file)."""
+    if isinstance(file, io.BytesIO):
+        file = file.getvalue()
+    elif not isinstance(file, (bytes, bytearray)):
+        file = file.read()
+    return file.decode("utf-8")
+
+def parse_document(uploaded_file, stats=None, max_bytes=None, max_pages=None, trace_memory=False):
     """
     Dispatcher function to parse uploaded files based on extension.
     Args:
-        uploaded_file: Streamlit UploadedFile object
+        uploaded_file: Streamlit UploadedFile object (or any BytesIO/stream with a
+            name, or a file path)
+        stats: optional dict, filled with the upload size, where it was read from,
+            the PDF page count and the parse time.
+        max_bytes, max_pages: override MAX_UPLOAD_MB / MAX_PDF_PAGES.
+        trace_memory: also record the peak traced memory of the parse in
+            stats["peak_memory"]. Uses tracemalloc, which is process-wide and
+            makes PDF parsing several times slower, so it's off by default.
     Returns:
         str: Extracted text
+    Raises:
+        UploadLimitError: the file is over the size or page limit.
     """
-    file_extension = uploaded_file.name.split(".")[-1].lower()
-    
+    name = uploaded_file if isinstance(uploaded_file, (str, os.PathLike)) else uploaded_file.name
+    file_extension = str(name).split(".")[-1].lower()
+    stats = stats if stats is not None else {}
+
     if file_extension == "pdf":
-        return extract_text_from_pdf(uploaded_file.getvalue())
-    elif file_extension in ["docx", "doc"]:
-        return extract_text_from_docx(uploaded_file.getvalue())
+        if max_pages is None:
+            max_pages = int(os.getenv("MAX_PDF_PAGES", DEFAULT_MAX_PDF_PAGES))
+        extract = functools.partial(extract_text_from_pdf, max_pages=max_pages, stats=stats)
+    elif file_extension == "docx":
+        extract = extract_text_from_docx
+    elif file_extension == "doc":
+        raise ValueError("Legacy .doc files are not supported. Please save the file as .docx or PDF.")
     elif file_extension == "txt":
-        return extract_text_from_txt(uploaded_file.getvalue())
+        extract = extract_text_from_txt
     else:
         raise ValueError(f"Unsupported file format: {file_extension}")
+
+    tracing = trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    elif trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with open_upload(uploaded_file, max_bytes=max_bytes, stats=stats) as file:
+            return extract(file)
+    finally:
+        stats["seconds"] = time.perf_counter() - started
+        if trace_memory:
+            stats["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
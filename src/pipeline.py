@@ -0,0 +1,74 @@
+"""
+The contract analysis pipeline run after a document is parsed: entity
+extraction, summary, clause splitting and classification, streamed clause
+analysis and risk scoring. The Analysis page and the benchmarks both call
+analyze_contract, so the benchmarked steps are the ones the app runs.
+"""
+import time
+
+from src.clause_classifier import get_clause_classifier
+from src.models import AnalysisResult
+from src.nlp import extract_entities, split_into_clauses
+from src.risk import calculate_risk_score, get_risk_level
+
+
+class AnalysisError(Exception):
+    """Raised when the contract summary fails, which stops the analysis."""
+
+
+def analyze_contract(text, llm, index=None, contract=None, extract=extract_entities, on_clause=None):
+    """
+    Analyzes parsed contract text.
+    Args:
+        llm: LLMService to use.
+        index: optional ClauseIndex for reusing earlier clause analyses.
+        contract: name recorded with new clause index entries.
+        extract: entity extractor, fn(text) -> dict of label -> values.
+        on_clause: called with each clause analysis as it arrives.
+    Returns (AnalysisResult, report), where report holds the clause count,
+    classification time, routing report, prompt tokens sent and the number
+    of reused clause analyses.
+    """
+    entities = extract(text)
+    summary = llm.summarize_contract(text)
+    if "error" in summary:
+        raise AnalysisError(summary["error"])
+
+    clauses = split_into_clauses(text)
+    started = time.perf_counter()
+    classifications = get_clause_classifier().classify(clauses)
+    classify_seconds = time.perf_counter() - started
+    routing = llm.routing_report(clauses, classifications)
+
+    tokens_before = llm.stats["prompt_tokens"]
+    clause_analysis = []
+    for analysis in llm.stream_analyze_clauses(clauses, index=index, contract=contract,
+                                               classifications=classifications):
+        clause_analysis.append(analysis)
+        if on_clause:
+            on_clause(analysis, len(clause_analysis))
+    # Results stream in completion order; keep them in document order
+    clause_analysis.sort(key=lambda a: a.get("position", len(clauses)))
+
+    # Use real clause scores if available, else fallback
+    overall = summary.get("overall_risk", "Medium")
+    if clause_analysis:
+        risk_score = calculate_risk_score(clause_analysis, overall)
+    else:
+        clauses_mock = [
+            {"risk_score": summary.get("risk_score", 5)},
+            {"risk_score": 2},
+            {"risk_score": 8 if overall == "High" else 3}
+        ]
+        risk_score = calculate_risk_score(clauses_mock, overall)
+
+    result = AnalysisResult.build(text, entities, summary, clause_analysis, clauses,
+                                  risk_score, get_risk_level(risk_score))
+    report = {
+        "clauses": len(clauses),
+        "classify_seconds": classify_seconds,
+        "routing": routing,
+        "prompt_tokens": llm.stats["prompt_tokens"] - tokens_before,
+        "reused": sum(1 for a in clause_analysis if "reused_from" in a),
+    }
+    return result, report
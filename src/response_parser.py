@@ -0,0 +1,340 @@
+"""
+Parsing, repair and schema validation for JSON returned by the LLM.
+Handles the usual ways model output goes wrong (code fences, trailing commas,
+truncated objects/arrays) so that a bad response doesn't force a full retry.
+"""
+import json
+import re
+
+# Per-prompt schemas. "required" fields trigger a targeted re-request when
+# missing; "optional" fields are only type-checked when present. "ranges"
+# gives inclusive bounds for integer fields; values outside them are invalid.
+SCHEMAS = {
+    "clause_analysis": {
+        "required": {
+            "explanation": str,
+            "risk_score": int,
+            "favorable": str,
+        },
+        "optional": {
+            "risk_reason": str,
+            "suggestion": str,
+        },
+        "ranges": {
+            "risk_score": (1, 10),
+        },
+    },
+    "summary": {
+        "required": {
+            "summary": str,
+            "contract_type": str,
+            "key_dates": list,
+            "key_obligations": list,
+            "overall_risk": str,
+            "specific_risks": dict,
+        },
+        "optional": {},
+    },
+    "comparison": {
+        "required": {
+            "similarity_score": int,
+            "deviations": str,
+            "verdict": str,
+        },
+        "optional": {},
+        "ranges": {
+            "similarity_score": (0, 100),
+        },
+    },
+    "translation": {
+        "required": {
+            "translations": list,
+        },
+        "optional": {},
+    },
+}
+
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+DANGLING_KEY_PATTERN = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+def strip_code_fences(text):
+    """Returns the contents of the first ```json ... ``` block, or the text unchanged."""
+    match = FENCE_PATTERN.search(text)
+    if match:
+        return match.group(1)
+    return text
+
+
+def remove_trailing_commas(text):
+    """Removes commas directly before a closing brace/bracket (outside strings)."""
+    out = []
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def close_truncated(text):
+    """
+    Closes a JSON document that was cut off mid-stream.
+    Terminates an open string, drops a dangling key or comma and appends
+    the missing closing brackets.
+    """
+    stack = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        if escape:
+            text = text[:-1]
+        text += '"'
+
+    text = text.rstrip()
+    # A key without a value ('"key":' or '"key"' inside an object) can't be kept
+    if stack and stack[-1] == "}":
+        match = DANGLING_KEY_PATTERN.search(text)
+        if match:
+            text = text[:match.start() + 1].rstrip()
+            if text.endswith(","):
+                text = text[:-1]
+    if text.endswith(","):
+        text = text[:-1]
+
+    return text + "".join(reversed(stack))
+
+
+def loads_strict(text):
+    """
+    The original parsing behaviour: plain json.loads, then the outermost {...}.
+    Returns None if that fails. The response benchmarks use it to count the
+    responses that would have needed a full retry before repair existed.
+    """
+    try:
+        return json.loads(text)
+    except (ValueError, TypeError):
+        pass
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    if start != -1 and end > start:
+        try:
+            return json.loads(text[start:end])
+        except ValueError:
+            pass
+    return None
+
+
+def repair_json(text):
+    """
+    Attempts to turn malformed LLM output into parsed JSON.
+    Returns the parsed object, or None if the text can't be salvaged.
+    """
+    if not text:
+        return None
+    candidate = strip_code_fences(text).strip()
+
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i != -1]
+    if not starts:
+        return None
+    candidate = candidate[min(starts):]
+
+    for attempt in (candidate, close_truncated(candidate)):
+        attempt = remove_trailing_commas(attempt)
+        try:
+            return json.loads(attempt)
+        except ValueError:
+            pass
+
+    # Last resort: cut back to the last complete value and close from there
+    trimmed = candidate
+    for _ in range(20):
+        cut = max(trimmed.rfind(","), trimmed.rfind("}"), trimmed.rfind("]"))
+        if cut <= 0:
+            break
+        trimmed = trimmed[:cut] if trimmed[cut] == "," else trimmed[:cut + 1]
+        try:
+            return json.loads(remove_trailing_commas(close_truncated(trimmed)))
+        except ValueError:
+            continue
+    return None
+
+
+def parse_response(text):
+    """
+    Parses an LLM response into a dict.
+    Returns (data, repaired) where repaired is True if the strict parse
+    failed and the repair path was needed. data is None on failure.
+    """
+    data = loads_strict(text) if text else None
+    if data is not None:
+        return data, False
+    return repair_json(text), True
+
+
+def _coerce(value, expected):
+    """Coerces common near-misses (e.g. "7" for 7). Returns (ok, value)."""
+    if expected is int:
+        if isinstance(value, bool):
+            return False, value
+        if isinstance(value, int):
+            return True, value
+        if isinstance(value, float):
+            return True, int(round(value))
+        if isinstance(value, str):
+            match = re.search(r"-?\d+", value)
+            if match:
+                return True, int(match.group())
+        return False, value
+    if expected is list and isinstance(value, str):
+        return True, [value]
+    if expected is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return True, str(value)
+    return isinstance(value, expected), value
+
+
+def validate(data, schema_name):
+    """
+    Validates a parsed response against SCHEMAS[schema_name].
+    Returns (cleaned, missing) where missing lists required fields that are
+    absent, have the wrong type or are out of range. Invalid optional fields
+    are dropped.
+    """
+    schema = SCHEMAS[schema_name]
+    ranges = schema.get("ranges", {})
+    if not isinstance(data, dict):
+        return {}, list(schema["required"])
+
+    cleaned = dict(data)
+    missing = []
+    for field, expected in schema["required"].items():
+        if field not in cleaned or cleaned[field] is None:
+            missing.append(field)
+            continue
+        ok, value = _coerce(cleaned[field], expected)
+        if ok and field in ranges:
+            low, high = ranges[field]
+            ok = low <= value <= high
+        if ok:
+            cleaned[field] = value
+        else:
+            del cleaned[field]
+            missing.append(field)
+
+    for field, expected in schema["optional"].items():
+        if field in cleaned:
+            ok, value = _coerce(cleaned[field], expected)
+            if ok:
+                cleaned[field] = value
+            else:
+                del cleaned[field]
+    return cleaned, missing
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for streamed JSON.
+    Feed it chunks as they arrive; it returns each object element of the first
+    array in the document as soon as that element is complete, e.g. the
+    per-clause entries of {"clauses": [{...}, {...}]}.
+    repaired counts the items that needed repair_json to parse.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.array_depth = None
+        self.item_start = None
+        self.in_string = False
+        self.escape = False
+        self.pos = 0
+        self.text = ""
+        self.repaired = 0
+
+    def _parse_item(self, text):
+        """Parses one array item, strictly if possible. Returns a dict or None."""
+        try:
+            item = json.loads(text)
+        except ValueError:
+            item = repair_json(text)
+            if isinstance(item, dict):
+                self.repaired += 1
+        return item if isinstance(item, dict) else None
+
+    def feed(self, chunk):
+        """Consumes a chunk and returns the list of newly completed items."""
+        self.text += chunk
+        items = []
+        for i in range(self.pos, len(self.text)):
+            ch = self.text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if ch == "[" and self.array_depth is None:
+                    self.array_depth = self.depth
+                elif ch == "{" and self.array_depth is not None and self.depth == self.array_depth + 1:
+                    self.item_start = i
+            elif ch in "}]":
+                if ch == "}" and self.item_start is not None and self.depth == self.array_depth + 1:
+                    item = self._parse_item(self.text[self.item_start:i + 1])
+                    if item is not None:
+                        items.append(item)
+                    self.item_start = None
+                if ch == "]" and self.depth == self.array_depth:
+                    self.array_depth = -1  # only the first array is tracked
+                self.depth -= 1
+        self.pos = len(self.text)
+        # Drop text we no longer need to keep the buffer small
+        if self.item_start is None and self.pos > 4096:
+            self.text = ""
+            self.pos = 0
+        return items
+
+    def close(self):
+        """
+        Call at the end of the stream. Returns the item that was still open
+        when the stream stopped (repaired), as a list of zero or one items.
+        """
+        if self.item_start is None:
+            return []
+        item = self._parse_item(self.text[self.item_start:])
+        self.item_start = None
+        return [item] if item is not None else []
@@ -0,0 +1,185 @@
+"""
+Batch translation with a segment-level translation memory.
+Text is split into sentences; each sentence is looked up in a local SQLite
+translation memory (exact match, then a normalized match that ignores case and
+whitespace) and only unseen sentences are sent to the LLM, in parallel batches.
+Boilerplate that recurs across contracts therefore costs no API calls.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Global translation memory, opened on first use
+TRANSLATION_MEMORY = None
+TRANSLATION_MEMORY_LOCK = threading.Lock()
+
+# Abbreviations that end in a period but don't end a sentence
+ABBREVIATIONS = ("Rs", "No", "Mr", "Mrs", "Ms", "Dr", "Ltd", "Pvt", "Inc", "Co", "vs", "e.g", "i.e", "etc", "viz", "Sec", "Art", "Cl")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;])\s+(?=[\"'(\[]?[A-Z0-9])")
+ABBREVIATION_PATTERN = re.compile(r"(?:^|\s)(?:" + "|".join(re.escape(a) for a in ABBREVIATIONS) + r")\.$", re.IGNORECASE)
+# Clause/list numbering such as "2." or "(a)" belongs to the sentence after it
+ENUMERATOR_PATTERN = re.compile(r"^\(?[0-9a-zA-Z]{1,3}[.)]$")
+
+
+def split_sentences(text):
+    """
+    Splits text into lines of sentences, preserving line breaks.
+    Returns a list of lines, each a list of sentence strings.
+    """
+    lines = []
+    for line in text.split("\n"):
+        sentences = []
+        for piece in SENTENCE_PATTERN.split(line.strip()):
+            if sentences and (ABBREVIATION_PATTERN.search(sentences[-1]) or ENUMERATOR_PATTERN.match(sentences[-1])):
+                sentences[-1] += " " + piece
+            elif piece:
+                sentences.append(piece)
+        lines.append(sentences)
+    return lines
+
+
+def normalize(segment):
+    """Normalization used for fuzzy memory hits: case and whitespace are ignored."""
+    return " ".join(segment.split()).casefold()
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Persistent segment -> translation store, one entry per target language."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    lang TEXT NOT NULL,
+                    exact_hash TEXT NOT NULL,
+                    norm_hash TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    PRIMARY KEY (lang, exact_hash)
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS segments_norm ON segments (lang, norm_hash)")
+
+    def lookup(self, segments, lang):
+        """Returns {segment: translation} for every segment found in memory."""
+        found = {}
+        with self.lock:
+            for segment in segments:
+                row = self.conn.execute(
+                    "SELECT target FROM segments WHERE lang = ? AND exact_hash = ?",
+                    (lang, _hash(segment))).fetchone()
+                if row is None:
+                    row = self.conn.execute(
+                        "SELECT target FROM segments WHERE lang = ? AND norm_hash = ? LIMIT 1",
+                        (lang, _hash(normalize(segment)))).fetchone()
+                if row is not None:
+                    found[segment] = row[0]
+        return found
+
+    def store(self, translations, lang):
+        """Saves {segment: translation} pairs for a language."""
+        rows = [(lang, _hash(src), _hash(normalize(src)), src, dst) for src, dst in translations.items()]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)", rows)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+
+def get_translation_memory():
+    """Returns the shared translation memory at TRANSLATION_MEMORY_PATH (default translation_memory.db)."""
+    global TRANSLATION_MEMORY
+    with TRANSLATION_MEMORY_LOCK:
+        if TRANSLATION_MEMORY is None:
+            TRANSLATION_MEMORY = TranslationMemory(os.getenv("TRANSLATION_MEMORY_PATH", "translation_memory.db"))
+    return TRANSLATION_MEMORY
+
+
+class Translator:
+    """
+    Translates text through the translation memory, sending only unseen
+    sentences to the LLM in batches of batch_size, max_workers at a time.
+    """
+
+    def __init__(self, llm, memory=None, batch_size=20, max_workers=4):
+        self.llm = llm
+        self.memory = memory if memory is not None else get_translation_memory()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        # untranslated: sentences left in the source language because their
+        # batch failed; errors: why those batches failed
+        self.stats = {"segments": 0, "memory_hits": 0, "translated": 0, "api_calls": 0,
+                      "untranslated": 0, "errors": []}
+
+    def translate_segments(self, segments, target_lang):
+        """
+        Translates a list of segments. Returns {segment: translation}; segments
+        that couldn't be translated are left out and counted in stats.
+        """
+        unique = list(dict.fromkeys(s for s in segments if s.strip()))
+        self.stats["segments"] += len(unique)
+
+        translations = self.memory.lookup(unique, target_lang)
+        self.stats["memory_hits"] += len(translations)
+
+        unseen = [s for s in unique if s not in translations]
+        batches = [unseen[i:i + self.batch_size] for i in range(0, len(unseen), self.batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda batch: self.llm.translate_batch(batch, target_lang), batches))
+            # Mock mode answers locally without sending anything
+            if self.llm.backend is not None:
+                self.stats["api_calls"] += len(batches)
+
+            fresh = {}
+            for batch, (translated, error) in zip(batches, results):
+                if error and error not in self.stats["errors"]:
+                    self.stats["errors"].append(error)
+                for source, target in zip(batch, translated):
+                    if target is not None:
+                        fresh[source] = target
+            self.stats["translated"] += len(fresh)
+            self.stats["untranslated"] += len(unseen) - len(fresh)
+            # Mock translations are placeholders and must not be remembered
+            if self.llm.backend is not None:
+                self.memory.store(fresh, target_lang)
+            translations.update(fresh)
+        return translations
+
+    def translate_texts(self, texts, target_lang):
+        """
+        Translates several texts sentence by sentence in one pass, keeping their
+        line breaks. Untranslated sentences stay in the source language; check
+        stats["untranslated"].
+        """
+        lines_per_text = [split_sentences(text) for text in texts]
+        segments = [s for lines in lines_per_text for line in lines for s in line]
+        translations = self.translate_segments(segments, target_lang)
+        return ["\n".join(" ".join(translations.get(s, s) for s in line) for line in lines)
+                for lines in lines_per_text]
+
+    def translate_analysis(self, result, target_lang):
+        """
+        Translates the summary, key obligations and clause explanations of an
+        analysis result together. Returns a dict with the same parts.
+        """
+        summary = result["summary"].get("summary", "")
+        obligations = [str(o) for o in result["summary"].get("key_obligations", [])]
+        clauses = [(c.get("id", "?"), str(c.get("explanation", ""))) for c in result.get("clauses", [])]
+
+        translated = self.translate_texts([summary] + obligations + [e for _, e in clauses], target_lang)
+        return {
+            "summary": translated[0],
+            "key_obligations": translated[1:1 + len(obligations)],
+            "clauses": [(clause_id, text) for (clause_id, _), text in zip(clauses, translated[1 + len(obligations):])],
+        }
@@ -1,13 +1,27 @@
 import unittest
+import io
 import os
 import sys
+import tempfile
+import threading
+import zipfile
+from unittest.mock import patch
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.parser import parse_document
+from src.parser import UploadLimitError, parse_document
 from src.nlp import extract_entities, split_into_clauses
 from src.risk import calculate_risk_score
+from src.backends import BackendError, FakeBackend, RecordReplayBackend, ReplayMissError, default_fake_response
+from src.clause_classifier import get_clause_classifier
+from src.clause_index import ClauseIndex
+from src.gateway import LLMGateway
+from src.llm import LLMService
+from src.models import AnalysisResult
+from src.pipeline import AnalysisError, analyze_contract
+from src.response_parser import IncrementalJSONParser, parse_response, validate
+from src.translation import TranslationMemory, Translator, split_sentences
 
 class TestContractAI(unittest.TestCase):
 
@@ -48,7 +62,385 @@ class TestContractAI(unittest.TestCase):
         self.assertEqual(len(clauses), 2)
         self.assertEqual(clauses[0]["id"], "1.")
         self.assertEqual(clauses[1]["id"], "2.")
+        for clause in clauses:
+            self.assertEqual(text[clause["start"]:clause["end"]], clause["text"])
         print(f"Splitted Clauses: {[c['id'] for c in clauses]}")
 
+    def test_docx_extraction(self):
+        """Test DOCX extraction of tables and Word auto-numbering, and the legacy .doc error."""
+        import docx
+        document = docx.Document()
+        document.add_paragraph("Definitions apply.", style="List Number")
+        document.add_paragraph("Payment is due monthly.", style="List Number")
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Fee"
+        table.cell(0, 1).text = "Rs. 10,000"
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        upload = io.BytesIO(buffer.getvalue())
+        upload.name = "contract.docx"
+        text = parse_document(upload)
+        self.assertIn("1. Definitions apply.", text)
+        self.assertIn("2. Payment is due monthly.", text)
+        self.assertIn("Fee | Rs. 10,000", text)
+        self.assertEqual([c["id"] for c in split_into_clauses(text)], ["1.", "2."])
+
+        # The same list with roman numbering
+        roman = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as source, zipfile.ZipFile(roman, "w") as target:
+            for item in source.infolist():
+                data = source.read(item.filename)
+                if item.filename == "word/numbering.xml":
+                    data = data.replace(b'w:val="decimal"', b'w:val="lowerRoman"')
+                target.writestr(item, data)
+        roman.seek(0)
+        roman.name = "contract.docx"
+        text = parse_document(roman)
+        self.assertIn("(i) Definitions apply.", text)
+        self.assertIn("(ii) Payment is due monthly.", text)
+
+        legacy = io.BytesIO(b"\xd0\xcf\x11\xe0")
+        legacy.name = "contract.doc"
+        with self.assertRaises(ValueError):
+            parse_document(legacy)
+
+    def test_upload_limits_and_spooling(self):
+        """Test that streamed uploads are spooled to disk and that size limits apply before parsing."""
+        class Stream:
+            name = "contract.txt"
+
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+
+            def read(self, size=-1):
+                return self.data.read(size)
+
+        data = b"1. Term\nThis Agreement lasts one year.\n" * 2000
+        stats = {}
+        with patch.dict(os.environ, {"UPLOAD_SPOOL_MB": "0.01"}):
+            text = parse_document(Stream(data), stats=stats, trace_memory=True)
+        self.assertEqual(text, data.decode("utf-8"))
+        self.assertEqual(stats["source"], "disk")
+        self.assertEqual(stats["bytes"], len(data))
+        self.assertGreater(stats["peak_memory"], 0)
+
+        with self.assertRaises(UploadLimitError):
+            parse_document(Stream(data), max_bytes=1024)
+        upload = io.BytesIO(data)
+        upload.name = "contract.txt"
+        with patch.dict(os.environ, {"MAX_UPLOAD_MB": "0.01"}), self.assertRaises(UploadLimitError):
+            parse_document(upload)
+
+    def test_compact_result(self):
+        """Test the compact result model against the dict layout and its binary round trip."""
+        text = "Preamble text.\n1. Definitions\nfoo bar.\n2. Term\nbaz qux."
+        clauses = split_into_clauses(text)
+        analyses = [{"id": c["id"], "explanation": "Plain.", "risk_score": 6, "favorable": "Mutual",
+                     "original_text": c["text"]} for c in clauses]
+        summary = {"summary": "Short.", "key_obligations": ["Pay"], "overall_risk": "Medium"}
+        result = AnalysisResult.build(text, {"Parties": ["Acme Corp"]}, summary, analyses, clauses, 45, "Medium")
+
+        self.assertEqual(result["clauses"][1].get("original_text"), "Definitions\nfoo bar.")
+        self.assertEqual(result.get("summary", {}).get("key_obligations"), ("Pay",))
+        self.assertEqual(result["clauses"][0].get("suggestion", "N/A"), "N/A")
+        restored = AnalysisResult.from_bytes(result.to_bytes())
+        self.assertEqual(restored.to_dict(), result.to_dict())
+
+        # Streamed analyses arrive out of order; positions put them back in document order
+        streamed = [dict(a, position=i) for i, a in enumerate(analyses)][::-1]
+        result = AnalysisResult.build(text, {}, summary, streamed, clauses, 45, "Medium")
+        self.assertEqual([c.id for c in result["clauses"]], [c["id"] for c in clauses])
+        self.assertEqual(result["clauses"][2].get("original_text"), "Term\nbaz qux.")
+
+class TestResponseParser(unittest.TestCase):
+
+    def test_repair_common_issues(self):
+        """Test repair of fences, trailing commas and truncated output."""
+        data, repaired = parse_response('```json\n{"risk_score": 7, "key_dates": ["2024-01-01",],}\n```')
+        self.assertTrue(repaired)
+        self.assertEqual(data, {"risk_score": 7, "key_dates": ["2024-01-01"]})
+
+        data, _ = parse_response('{"summary": "NDA between parties", "key_obligations": ["Keep secrets", "Return mat')
+        self.assertEqual(data["key_obligations"], ["Keep secrets", "Return mat"])
+
+        data, repaired = parse_response('{"verdict": "Fair"}')
+        self.assertFalse(repaired)
+
+    def test_schema_validation(self):
+        """Test coercion and detection of missing required fields."""
+        cleaned, missing = validate({"explanation": "Fine.", "risk_score": "8/10"}, "clause_analysis")
+        self.assertEqual(cleaned["risk_score"], 8)
+        self.assertEqual(missing, ["favorable"])
+
+        # Out-of-range scores are treated as missing so they get re-requested
+        for score in (85, "40000", 0):
+            cleaned, missing = validate({"explanation": "Fine.", "risk_score": score, "favorable": "Mutual"},
+                                        "clause_analysis")
+            self.assertNotIn("risk_score", cleaned)
+            self.assertEqual(missing, ["risk_score"])
+
+    def test_incremental_parsing(self):
+        """Test that streamed array items are emitted as soon as they close."""
+        parser = IncrementalJSONParser()
+        stream = '{"clauses": [{"id": "1.", "explanation": "a {brace}"}, {"id": "2.", "risk_score": 3}, {"id": "3."'
+        emitted = []
+        for i in range(0, len(stream), 5):
+            emitted.extend(parser.feed(stream[i:i + 5]))
+        self.assertEqual([item["id"] for item in emitted], ["1.", "2."])
+        self.assertEqual(parser.repaired, 0)
+        self.assertEqual(parser.feed('}, {"id": "4.", "risk_score": 2,}'), [{"id": "3."}, {"id": "4.", "risk_score": 2}])
+        self.assertEqual(parser.repaired, 1)
+
+class TestBackends(unittest.TestCase):
+
+    def test_fake_backend_pipeline(self):
+        """Test that every LLMService method runs against the fake backend."""
+        llm = LLMService(backend=FakeBackend(seed=0))
+        self.assertNotIn("error", llm.summarize_contract("This Agreement..."))
+        self.assertNotIn("error", llm.compare_clause_with_standard("a", "b"))
+        clauses = [{"id": "1.", "text": "foo"}, {"id": "2.", "text": "bar"}]
+        self.assertEqual([c["id"] for c in llm.batch_analyze_clauses(clauses)], ["1.", "2."])
+        self.assertEqual(llm.stats["calls"], 3)
+
+    def test_repeated_clause_ids(self):
+        """Test that clauses sharing an id (e.g. "1." in two schedules) are all analyzed, in document order."""
+        text = ("Preamble text.\n1. Fees\nThe Client shall pay Rs. 500.\n2. Term\nOne year.\n"
+                "Schedule B\n1. Support\nThe Supplier shall respond within a day.")
+        clauses = split_into_clauses(text)
+        self.assertEqual([c["id"] for c in clauses], ["Preamble", "1.", "2.", "1."])
+        results = LLMService(backend=FakeBackend()).batch_analyze_clauses(clauses)
+        self.assertEqual([r["position"] for r in results], [0, 1, 2, 3])
+        self.assertEqual([r["original_text"] for r in results], [c["text"] for c in clauses])
+        self.assertTrue(all("risk_score" in r for r in results))
+
+    def test_analysis_pipeline(self):
+        """Test the app's analysis pipeline end to end with stubbed entity extraction."""
+        text = ("1. Payment\nThe Client shall pay each invoice within thirty days.\n"
+                "2. Severability\nIf any provision is held invalid, the rest remains in force.\n"
+                "3. Term\nThis Agreement lasts two years.")
+        arrived = []
+        result, report = analyze_contract(text, LLMService(backend=FakeBackend()), extract=lambda t: {"Parties": ["Acme"]},
+                                          on_clause=lambda analysis, done: arrived.append(analysis["id"]))
+        self.assertEqual([c.id for c in result["clauses"]], ["1.", "2.", "3."])
+        self.assertEqual(len(arrived), 3)
+        self.assertEqual(result["entities"], {"Parties": ("Acme",)})
+        self.assertGreater(report["prompt_tokens"], 0)
+
+        failing = LLMService(backend=FakeBackend(failure_rate=1.0))
+        self.assertRaises(AnalysisError, analyze_contract, text, failing, extract=lambda t: {})
+
+    def test_fake_backend_limits(self):
+        """Test simulated rate limits and failures."""
+        backend = FakeBackend(rate_limit=2, rate_window=60)
+        messages = [{"role": "user", "content": "hi"}]
+        backend.complete(messages)
+        backend.complete(messages)
+        self.assertRaises(BackendError, backend.complete, messages)
+        self.assertEqual(backend.stats["rate_limited"], 1)
+        self.assertRaises(BackendError, FakeBackend(failure_rate=1.0).complete, messages)
+
+    def test_record_replay(self):
+        """Test that recorded responses replay deterministically."""
+        with tempfile.TemporaryDirectory() as directory:
+            recorded = LLMService(backend=RecordReplayBackend(directory, "record", inner=FakeBackend()))
+            expected = recorded.summarize_contract("Contract text")
+            replay = RecordReplayBackend(directory, "replay")
+            self.assertEqual(LLMService(backend=replay).summarize_contract("Contract text"), expected)
+            self.assertRaises(ReplayMissError, replay.complete, [{"role": "user", "content": "unseen"}])
+
+class TestGateway(unittest.TestCase):
+
+    def test_coalesces_identical_prompts(self):
+        """Test that identical in-flight prompts share one backend request."""
+        release = threading.Event()
+        backend = FakeBackend(responder=lambda messages, json_mode: release.wait() and "done")
+        gateway = LLMGateway(backend, requests_per_minute=6000, burst=10, workers=2)
+        messages = [{"role": "user", "content": "same prompt"}]
+        futures = [gateway.submit(f"user-{i}", messages) for i in range(5)]
+        release.set()
+        self.assertEqual({f.result(timeout=5) for f in futures}, {"done"})
+        self.assertEqual(backend.stats["requests"], 1)
+        self.assertEqual(gateway.metrics()["coalesced"], 4)
+
+    def test_fair_queuing(self):
+        """Test that a light user isn't stuck behind a heavy user's burst."""
+        served = []
+        release = threading.Event()
+
+        def responder(messages, json_mode):
+            release.wait()
+            served.append(messages[0]["content"])
+            return "ok"
+
+        gateway = LLMGateway(FakeBackend(responder=responder), requests_per_minute=6000, burst=20, workers=1)
+        futures = [gateway.submit("heavy", [{"role": "user", "content": f"heavy-{i}"}]) for i in range(6)]
+        futures += [gateway.submit("light", [{"role": "user", "content": "light-0"}])]
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertLessEqual(served.index("light-0"), 2)
+
+    def test_fair_queuing_many_workers(self):
+        """Test that workers waiting on the rate limit don't pick requests ahead of their turn."""
+        served = []
+
+        def responder(messages, json_mode):
+            served.append(messages[0]["content"])
+            return "ok"
+
+        gateway = LLMGateway(FakeBackend(responder=responder), requests_per_minute=1200, burst=1, workers=8)
+        for i in range(20):
+            gateway.submit("heavy", [{"role": "user", "content": f"heavy-{i}"}])
+        gateway.submit("light", [{"role": "user", "content": "light-0"}]).result(timeout=5)
+        self.assertLessEqual(served.index("light-0"), 2)
+
+class TestTranslation(unittest.TestCase):
+
+    def test_sentence_segmentation(self):
+        """Test that abbreviations and numbering don't split sentences."""
+        lines = split_sentences("The fee is Rs. 500 per month. Either party may terminate.\n2. Notices apply.")
+        self.assertEqual(lines, [["The fee is Rs. 500 per month.", "Either party may terminate."], ["2. Notices apply."]])
+
+    def test_translation_memory_reuse(self):
+        """Test that repeated boilerplate is served from the translation memory."""
+        backend = FakeBackend()
+        memory = TranslationMemory()
+        first = Translator(LLMService(backend=backend), memory, batch_size=2)
+        first.translate_texts(["This is an NDA. It protects secrets. The term is 3 years."], "Hindi")
+        self.assertEqual(first.stats["api_calls"], 2)
+
+        second = Translator(LLMService(backend=backend), memory)
+        translated = second.translate_texts(["THIS IS AN NDA.  It protects secrets."], "Hindi")
+        self.assertEqual(second.stats["api_calls"], 0)
+        self.assertEqual(second.stats["memory_hits"], 2)
+        self.assertIn("It protects secrets.", translated[0])
+        self.assertEqual(backend.stats["requests"], 2)
+
+    def test_failed_translation_is_reported(self):
+        """Test that segments from a failed batch are counted and not remembered."""
+        memory = TranslationMemory()
+        translator = Translator(LLMService(backend=FakeBackend(failure_rate=1.0)), memory)
+        translated = translator.translate_texts(["This is an NDA. It protects secrets."], "Hindi")
+        self.assertEqual(translated, ["This is an NDA. It protects secrets."])
+        self.assertEqual(translator.stats["untranslated"], 2)
+        self.assertEqual(translator.stats["translated"], 0)
+        self.assertEqual(len(translator.stats["errors"]), 1)
+        self.assertEqual(len(memory), 0)
+
+        mock_llm = LLMService(backend=FakeBackend())
+        mock_llm.backend = None  # mock mode
+        mock = Translator(mock_llm, memory)
+        mock.translate_texts(["This is an NDA."], "Hindi")
+        self.assertEqual((mock.stats["api_calls"], mock.stats["untranslated"]), (0, 0))
+
+class TestClauseIndex(unittest.TestCase):
+
+    def test_near_duplicate_lookup(self):
+        """Test that only identical wording is reused and lightly edited clauses are references."""
+        index = ClauseIndex()
+        clause = ("Receiving Party shall hold and maintain the Confidential Information in strictest confidence "
+                  "for the sole and exclusive benefit of the Disclosing Party.")
+        row_id = index.add(clause, {"risk_score": 4}, contract="nda.pdf", clause_id="3.")
+        self.assertEqual(index.find_analysis("  " + clause.upper()), ({"risk_score": 4}, 1.0, row_id, True))
+        analysis, similarity, found, exact = index.find_analysis(clause.replace("strictest", "strict"))
+        self.assertEqual((analysis, found, exact), ({"risk_score": 4}, row_id, False))
+        self.assertGreater(similarity, 0.7)
+        self.assertIsNone(index.find_analysis("The Employee shall be entitled to participate in all benefit plans."))
+
+        # A second copy is folded into the existing entry; an edited one is not
+        self.assertEqual(index.add(clause, contract="nda_v2.pdf"), row_id)
+        self.assertNotEqual(index.add(clause.replace("strictest", "strict")), row_id)
+        self.assertEqual(index.stats()["clause_occurrences"], 3)
+
+    def test_full_band_buckets(self):
+        """Test that lookups read a bounded number of rows per band and still find a near-duplicate."""
+        index = ClauseIndex(bucket_limit=2)
+        clause = ("The Supplier shall deliver the Goods to the Purchaser's premises within thirty days "
+                  "of the purchase order, at the Supplier's own cost and risk.")
+        first = index.add(clause, {"risk_score": 3})
+        for i in range(20):
+            index.add(clause + f" Schedule {i}.", {"risk_score": 3})
+        matches = index.query(clause.replace("thirty", "forty"), limit=50)
+        self.assertLessEqual(len(matches), index.bands * index.bucket_limit)
+        self.assertIn(first, [row_id for row_id, _ in matches])
+
+    def test_reuse_in_clause_analysis(self):
+        """Test that identical clauses skip the LLM and negated ones are only a reference."""
+        prompts = []
+
+        def responder(messages, json_mode):
+            prompts.append(messages[-1]["content"])
+            return default_fake_response(messages, json_mode)
+
+        llm = LLMService(backend=FakeBackend(responder=responder))
+        index = ClauseIndex()
+        text = ("1. Non-Compete\nThe Employee shall engage in any business that competes with the Company "
+                "within India during employment and for two years after termination.")
+        llm.batch_analyze_clauses(split_into_clauses(text), index=index, contract="a")
+        reused = llm.batch_analyze_clauses(split_into_clauses(text.replace("\nThe", "\n the")), index=index, contract="b")
+        self.assertEqual(len(prompts), 1)
+        self.assertIn("reused_from", reused[0])
+
+        negated = llm.batch_analyze_clauses(split_into_clauses(text.replace(" shall ", " shall not ", 1)),
+                                            index=index, contract="c")
+        self.assertEqual(len(prompts), 2)
+        self.assertNotIn("reused_from", negated[0])
+        self.assertIn("A similar clause was previously rated", prompts[1])
+
+class TestClauseClassifier(unittest.TestCase):
+
+    def test_classification(self):
+        """Test clause types on clauses that aren't in the training fixtures."""
+        clauses = [
+            {"id": "1.", "text": "Indemnity.\nThe Vendor shall indemnify and hold the Purchaser harmless from any loss suffered due to defective goods."},
+            {"id": "2.", "text": "Severability.\nIf any part of this Agreement is held unenforceable, the remaining parts shall remain in full force."},
+            {"id": "3.", "text": "Governing Law.\nThis Agreement is governed by the laws of India and the courts at Chennai have jurisdiction."},
+        ]
+        results = get_clause_classifier().classify(clauses)
+        self.assertEqual([r["type"] for r in results], ["indemnity", "severability", "dispute_resolution"])
+        self.assertEqual([r["skip"] for r in results], [False, True, False])
+
+    def test_risky_boilerplate_wording_not_skipped(self):
+        """Test that a risky term phrased like boilerplate is still sent for analysis."""
+        clauses = [
+            {"id": "1.", "text": "If any provision is held unenforceable, the Employee shall nevertheless be bound "
+                                 "by a non-compete for five years worldwide."},
+            {"id": "2.", "text": "The Agreement and/or any rights arising from it cannot be assigned or otherwise "
+                                 "transferred either wholly or in part, without the written consent of the other Party.\n"
+                                 "IN WITNESS WHEREOF, the parties hereto have executed this Agreement as of the date "
+                                 "first above written."},
+        ]
+        self.assertEqual([r["skip"] for r in get_clause_classifier().classify(clauses)], [False, False])
+
+    def test_routing_skips_boilerplate(self):
+        """Test that skipped clauses never reach the LLM and analyzed ones carry their type."""
+        prompts = []
+
+        def responder(messages, json_mode):
+            prompts.append(messages[-1]["content"])
+            return default_fake_response(messages, json_mode)
+
+        llm = LLMService(backend=FakeBackend(responder=responder))
+        text = ("1. Payment\nThe Client shall pay each invoice within thirty days of receipt.\n"
+                "2. Waiver\nNo failure or delay in exercising any right shall operate as a waiver of it.")
+        clauses = split_into_clauses(text)
+        classifications = get_clause_classifier().classify(clauses)
+        results = llm.batch_analyze_clauses(clauses, classifications=classifications)
+
+        self.assertEqual(results[0]["clause_type"], "payment")
+        self.assertIn("risk_score", results[0])
+        self.assertNotIn("risk_score", results[1])
+        self.assertEqual(llm.stats["skipped"], 1)
+        self.assertEqual(len(prompts), 1)
+        self.assertNotIn("No failure or delay", prompts[0])
+        # The report prices the prompt that was actually sent against the generic prompt for the same clause
+        report = llm.routing_report(clauses, classifications)
+        self.assertEqual(report["routed_tokens"], llm.stats["prompt_tokens"])
+        self.assertEqual((report["generic_clauses"], report["generic_boilerplate"]), (2, 1))
+        self.assertGreater(report["saved_ratio"], 0.3)
+        # The routed frame, without any clauses, is less than half the generic one
+        self.assertLess(2 * len(llm.batch_prompt(clauses, [], types={})), len(llm.batch_prompt(clauses, [])))
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)